@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Gensty checks. Quick assertion based checks of the compact data structures
+behind the benchmarks (GlyphTable, RangeIndex, slotted styles and the merged
+symbol index), on synthetic fonts.
+
+Usage:
+    python benchmarks/checks.py
+"""
+import os
+import sys
+import copy
+import pickle
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import makeFont, namedCodepoints
+from gensty.font import LaTeXstyle
+from gensty.merge import MergedStyle, SymbolIndex
+from gensty.names import GlyphTable
+from gensty.ranges import RangeIndex
+
+
+def checkGlyphTable():
+    """checkGlyphTable. Indexing, slicing and equality with lists."""
+    items = [(0x41, "A"), (0x3B1, "alpha"), (0x2200, "ForAll"), (0x1D11E, "")]
+    table = GlyphTable(items)
+    assert len(table) == len(items)
+    assert table == items and items == table
+    assert list(table) == items
+    for idx in range(-len(items), len(items)):
+        assert table[idx] == items[idx]
+    for idx in [len(items), -len(items) - 1]:
+        try:
+            table[idx]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError("index %d should be out of range" % idx)
+    for sliced in [slice(1, 3), slice(None, None, -1), slice(0, 4, 2),
+                   slice(3, 1), slice(-2, None)]:
+        assert isinstance(table[sliced], GlyphTable)
+        assert table[sliced] == items[sliced]
+    assert table != items[:-1]
+    assert table != [(0x41, "B")] + items[1:]
+    assert GlyphTable() == []
+    assert pickle.loads(pickle.dumps(table)) == table
+
+
+def checkRangeIndex():
+    """checkRangeIndex. Overlapping and adjacent ranges are merged."""
+    index = RangeIndex([(10, 20), (0, 5), (15, 30), (31, 40), (50, 50),
+                        (45, 48)])
+    assert index.ranges() == [(0, 5), (10, 40), (45, 48), (50, 50)]
+    assert len(index) == 4
+    for codepoint in [0, 5, 10, 31, 40, 45, 50]:
+        assert codepoint in index
+    for codepoint in [6, 9, 41, 44, 49, 51]:
+        assert codepoint not in index
+    assert RangeIndex([]).ranges() == []
+    assert 0 not in RangeIndex([])
+    assert RangeIndex([(5, 10), (6, 7)]).ranges() == [(5, 10)]
+
+
+def checkSlottedStyle(fontfile: str):
+    """checkSlottedStyle. Slotted styles survive pickling (process pools)
+    and copying (server memory)."""
+    pkg = LaTeXstyle(fontfile=fontfile, version="v1.0", author="Checks")
+    expected = pkg.File()
+    for clone in [pickle.loads(pickle.dumps(pkg)), copy.copy(pkg),
+                  copy.deepcopy(pkg)]:
+        assert clone.name == pkg.name
+        assert clone.fontfile == pkg.fontfile
+        assert clone.codepoints == pkg.codepoints
+        assert clone.File() == expected
+    clone = copy.copy(pkg)
+    clone.setPackage("Renamed")
+    assert pkg.File() == expected
+
+
+def checkSymbolIndex(workdir: str):
+    """checkSymbolIndex. Every name is resolved to the font ranked first."""
+    named = namedCodepoints(30)
+    ranges = {"A": named[0:10], "B": named[5:30], "C": named[25:27]}
+    fonts = []
+    for family, codepoints in ranges.items():
+        fontfile = os.path.join(workdir, "%s.ttf" % family)
+        makeFont(fontfile, codepoints, family)
+        fonts.append(LaTeXstyle(fontfile=fontfile))
+    expected = {
+        "first": {0: named[0:10], 1: named[10:30], 2: []},
+        "last": {0: named[0:5], 1: named[5:25] + named[27:30],
+                 2: named[25:27]},
+        "coverage": {0: named[0:5], 1: named[5:30], 2: []},
+    }
+    for priority, owners in expected.items():
+        index = SymbolIndex(fonts, priority)
+        assert len(index.symbols) == len(named), priority
+        for idx, codepoints in owners.items():
+            assert [code for code, _ in index.codepoints(idx)] == codepoints, \
+                (priority, idx)
+        assert len(index.overridden) == sum(
+            len(codes) for codes in ranges.values()) - len(named), priority
+    try:
+        SymbolIndex(fonts, "unknown")
+    except Exception:
+        pass
+    else:
+        raise AssertionError("unknown priority should be rejected")
+
+
+def checkSharedFamily(workdir: str):
+    """checkSharedFamily. Different font files with the same family name are
+    bundled as different families, eg. two versions of a font."""
+    named = namedCodepoints(20)
+    fonts = []
+    for version, codepoints in [("v1", named[:10]), ("v2", named[5:])]:
+        os.makedirs(os.path.join(workdir, version))
+        fontfile = os.path.join(workdir, version, "Shared.ttf")
+        makeFont(fontfile, codepoints, "Shared")
+        fonts.append(LaTeXstyle(fontfile=fontfile))
+    merged = MergedStyle(fonts, "Versions")
+    assert [pkg.fontfile for pkg, _ in merged.bundledFonts()] == \
+        [pkg.fontfile for pkg in fonts]
+    assert [codes for _, codes in merged.bundledFonts()] == \
+        [named[:10], named[10:]]
+    families = merged.FontFamilies()
+    assert "\\fntsharedregular{" in families
+    assert "\\fntsharedregulara{" in families
+    assert "\\fntsharedregulara\\symbol{%d}" % named[-1] in merged.Commands()
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="gensty-checks-")
+    try:
+        fontfile = os.path.join(workdir, "Synthetic.ttf")
+        makeFont(fontfile, namedCodepoints(100))
+        checkGlyphTable()
+        checkRangeIndex()
+        checkSlottedStyle(fontfile)
+        checkSymbolIndex(workdir)
+        checkSharedFamily(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("All checks passed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Gensty benchmarks. Times and measures the peak memory of prepareFonts,
+makePackage and savePackage separately, on synthetic fonts of configurable
+size, and flags regressions against a stored baseline.
+
+Usage:
+    python benchmarks/run.py --sizes 100,1000,10000,60000 --output results.json
+    python benchmarks/run.py --baseline results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import makeFont, makeGlyphnames, namedCodepoints, smuflCodepoints
+from gensty.cli import prepareFonts, makePackage, savePackage
+from gensty.cache import Cache
+from gensty.config import __version__, BACKENDS
+
+
+def measure(func, *args, **kwargs) -> tuple:
+    """measure. Runs a function measuring wall time and peak allocation.
+
+    Returns:
+        The result, seconds and peak bytes allocated.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def makeCase(workdir: str, size: int, fmt: str, smufl: bool) -> tuple:
+    """makeCase. Builds the synthetic font of a case, along with SMuFL
+    glyphnames if needed.
+
+    Returns:
+        Font file and glyphnames file, or None.
+    """
+    fontfile = os.path.join(workdir, "synthetic%d.%s" % (size, fmt))
+    glyphnames = None
+    if smufl:
+        codepoints = smuflCodepoints(size)
+        glyphnames = os.path.join(workdir, "glyphnames.json")
+        makeGlyphnames(glyphnames, smuflCodepoints(min(size * 2, 6400)))
+    else:
+        codepoints = namedCodepoints(size)
+    makeFont(fontfile, codepoints, "Synthetic%d" % size, cff=fmt == "otf")
+    return fontfile, glyphnames
+
+
+def benchmarkCase(output: str, fontfile: str, glyphnames: str,
+                  cache: Cache, backend: str) -> dict:
+    """benchmarkCase. Benchmarks the three generation phases on one
+    synthetic font, saving packages in the new folder `output`.
+
+    Returns:
+        Seconds and peak bytes per phase.
+    """
+    os.makedirs(output)
+    cwd = os.getcwd()
+    os.chdir(output)
+    try:
+        fonts, prepareTime, preparePeak = measure(
+            prepareFonts, fontfile, smufl=glyphnames, cache=cache)
+        (names, fontfiles, files), makeTime, makePeak = measure(
+            makePackage, fonts, backend=backend)
+        _, saveTime, savePeak = measure(savePackage, names, fontfiles, files)
+    finally:
+        os.chdir(cwd)
+    return {
+        "prepareFonts": {"seconds": prepareTime, "peak": preparePeak},
+        "makePackage": {"seconds": makeTime, "peak": makePeak},
+        "savePackage": {"seconds": saveTime, "peak": savePeak},
+        "latex": latexLoadTime(output, names[0], backend),
+    }
+
+
+def latexLoadTime(output: str, name: str, backend: str) -> dict:
+    """latexLoadTime. Compiles a document loading the package with LuaLaTeX,
+    if available.
+
+    Returns:
+        Seconds to compile, or None.
+    """
+    if shutil.which("lualatex") == None:
+        return None
+    document = os.path.join(output, name, "benchmark.tex")
+    with open(document, "w") as f:
+        f.write("\\documentclass{article}\n\\usepackage{%s}\n"
+                "\\begin{document}\nx\n\\end{document}\n" % name)
+    start = time.perf_counter()
+    run = subprocess.run(["lualatex", "-interaction=batchmode", "benchmark.tex"],
+                         cwd=os.path.dirname(document), stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL)
+    if run.returncode != 0:
+        return None
+    return {"seconds": time.perf_counter() - start, "peak": None}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """compare. Finds the phases slower or heavier than baseline by more than
+    `threshold` (ratio).
+
+    Returns:
+        Regression messages.
+    """
+    regressions = []
+    for case, phases in results["cases"].items():
+        for phase, values in phases.items():
+            base = baseline.get("cases", {}).get(case, {}).get(phase)
+            if values == None or base == None:
+                continue
+            for metric in ["seconds", "peak"]:
+                if values[metric] == None or not base.get(metric):
+                    continue
+                ratio = values[metric] / base[metric]
+                if ratio > 1 + threshold:
+                    regressions.append("%s %s %s: %.3g -> %.3g (+%.0f%%)" % (
+                        case, phase, metric, base[metric], values[metric],
+                        (ratio - 1) * 100))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gensty benchmarks")
+    parser.add_argument("--sizes", default="100,1000,10000,60000",
+                        help="Comma separated glyph counts.")
+    parser.add_argument("--formats", default="ttf,otf",
+                        help="Comma separated font formats (ttf, otf).")
+    parser.add_argument("--smufl", action="store_true",
+                        help="Also benchmark SMuFL fonts with glyphnames.")
+    parser.add_argument("--backends", default="macros",
+                        help="Comma separated backends (%s)." % ",".join(sorted(BACKENDS)))
+    parser.add_argument("--cache", action="store_true",
+                        help="Measures warm runs, with a populated cache.")
+    parser.add_argument("--output", help="Writes results as JSON.")
+    parser.add_argument("--baseline", help="Compares results to baseline JSON.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Regression threshold, ratio over baseline.")
+    args = parser.parse_args()
+
+    results = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": {},
+    }
+    workroot = tempfile.mkdtemp(prefix="gensty-bench-")
+    cache = Cache(path=os.path.join(workroot, "cache")) if args.cache else None
+    try:
+        for size in [int(size) for size in args.sizes.split(",")]:
+            for fmt in args.formats.split(","):
+                for smufl in [False, True] if args.smufl else [False]:
+                    if smufl and size > 6400:
+                        continue
+                    for backend in args.backends.split(","):
+                        case = "%s-%d%s-%s" % (fmt, size,
+                                               "-smufl" if smufl else "", backend)
+                        workdir = tempfile.mkdtemp(dir=workroot)
+                        fontfile, glyphnames = makeCase(workdir, size, fmt,
+                                                        smufl)
+                        if cache != None:
+                            # warm up the cache with a first run, on the
+                            # same font file.
+                            benchmarkCase(os.path.join(workdir, "warmup"),
+                                          fontfile, glyphnames, cache, backend)
+                        phases = benchmarkCase(os.path.join(workdir, "output"),
+                                               fontfile, glyphnames, cache,
+                                               backend)
+                        results["cases"][case] = phases
+                        print("%-28s" % case + "  ".join(
+                            "%s %.3fs %.1fMiB" % (phase, values["seconds"],
+                                                  (values["peak"] or 0) / 2**20)
+                            for phase, values in phases.items() if values))
+    finally:
+        shutil.rmtree(workroot, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
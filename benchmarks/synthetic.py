@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Synthetic fonts for benchmarks. Builds OpenType fonts (ttf/otf) of any
+size offline with fontTools FontBuilder, along with SMuFL glyphnames."""
+import sys
+import json
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from gensty.names import unicodedata
+from typing import List
+
+PRIVATE_USE = (0xE000, 0xF8FF)
+# head created/modified of synthetic fonts, seconds since 1904-01-01.
+TIMESTAMP = 3786825600
+
+
+def namedCodepoints(count: int) -> List[int]:
+    """namedCodepoints. The first `count` codepoints having a Unicode name.
+
+    Args:
+        count (int): Number of codepoints.
+
+    Returns:
+        Codepoints.
+    """
+    result = []
+    for codepoint in range(0x21, sys.maxunicode + 1):
+        if unicodedata.name(chr(codepoint), None) == None:
+            continue
+        result.append(codepoint)
+        if len(result) == count:
+            return result
+    raise Exception("Error! Only %d named codepoints." % len(result))
+
+
+def smuflCodepoints(count: int) -> List[int]:
+    """smuflCodepoints. The first `count` Private Use Area codepoints, as
+    used by SMuFL.
+
+    Args:
+        count (int): Number of codepoints.
+
+    Returns:
+        Codepoints.
+    """
+    if count > PRIVATE_USE[1] - PRIVATE_USE[0] + 1:
+        raise Exception("Error! Private Use Area has only 6400 codepoints.")
+    return list(range(PRIVATE_USE[0], PRIVATE_USE[0] + count))
+
+
+def __drawGlyph(pen):
+    pen.moveTo((50, 0))
+    pen.lineTo((50, 700))
+    pen.lineTo((550, 700))
+    pen.lineTo((550, 0))
+    pen.closePath()
+
+
+def makeFont(path: str, codepoints: List[int], family: str = "Synthetic",
+             cff: bool = False):
+    """makeFont. Builds a font mapping every codepoint to its own glyph.
+    Timestamps are fixed, so the same arguments always build the same file.
+
+    Args:
+        path (str): Font file to save.
+        codepoints (List[int]): Codepoints included in font.
+        family (str): Font family name.
+        cff (bool): Builds a CFF (otf) font instead of TrueType (ttf).
+    """
+    glyphs = [".notdef"] + ["uni%04X" % code for code in codepoints]
+    builder = FontBuilder(1000, isTTF=not cff)
+    builder.updateHead(created=TIMESTAMP, modified=TIMESTAMP)
+    builder.setupGlyphOrder(glyphs)
+    builder.setupCharacterMap({code: "uni%04X" % code for code in codepoints})
+    if cff:
+        charStrings = {}
+        for glyph in glyphs:
+            pen = T2CharStringPen(600, None)
+            __drawGlyph(pen)
+            charStrings[glyph] = pen.getCharString()
+        builder.setupCFF(family + "-Regular", {"FullName": family},
+                         charStrings, {})
+    else:
+        pen = TTGlyphPen(None)
+        __drawGlyph(pen)
+        outline = pen.glyph()
+        builder.setupGlyf({glyph: outline for glyph in glyphs})
+    builder.setupHorizontalMetrics({glyph: (600, 50) for glyph in glyphs})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({
+        "familyName": family,
+        "styleName": "Regular",
+        "fullName": family + " Regular",
+        "psName": family + "-Regular",
+    })
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(path)
+
+
+def makeGlyphnames(path: str, codepoints: List[int]):
+    """makeGlyphnames. Writes a SMuFL glyphnames.json for the codepoints.
+
+    Args:
+        path (str): File to save.
+        codepoints (List[int]): Codepoints of glyphnames.
+    """
+    glyphnames = {}
+    for idx, code in enumerate(codepoints):
+        glyphnames["glyph%d" % idx] = {
+            "codepoint": "U+%04X" % code,
+            "description": "Synthetic glyph %d" % idx,
+        }
+    with open(path, "w") as f:
+        json.dump(glyphnames, f, indent=1)
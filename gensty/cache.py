@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""Gensty cache. A persistent, content addressed and size bounded cache used
+to avoid parsing unchanged fonts on every run."""
+import os
+import json
+import mmap
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from gensty.config import CACHE_MAX_SIZE, CACHE_VERSION, HASH_MEMO_SIZE
+from gensty.config import __version__
+from typing import Union
+
+
+def cacheDir() -> str:
+    """cacheDir. The default cache directory, according to the XDG base
+    directory specification.
+
+    Returns:
+        Path of gensty cache directory.
+    """
+    base = os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "gensty")
+
+
+# Temporary cache of this process, see temporaryCache.
+_temporary = None
+
+# Cache directories used by this process, see isCached.
+_roots = set()
+
+
+def temporaryCache() -> "Cache":
+    """temporaryCache. A cache in a temporary directory, removed when the
+    process exits. Used for files gensty needs even when caching is disabled,
+    eg. subsets and decompressed web fonts. Nothing is evicted from it, since
+    its files are in use until the process exits.
+
+    Returns:
+        Temporary cache.
+    """
+    global _temporary
+    if _temporary == None:
+        path = tempfile.mkdtemp(prefix="gensty-")
+        atexit.register(shutil.rmtree, path, True)
+        _temporary = Cache(path=path)
+        _temporary.deferred = True
+    return _temporary
+
+
+# Hashes computed by this process, by file identity and status, least
+# recently used first. Bounded, since --watch and --serve run for long.
+_hashes = OrderedDict()
+_hashesLock = threading.Lock()
+
+
+def mapFile(path: str) -> Union[mmap.mmap, None]:
+    """mapFile. Maps a file in memory, read only. Pages of the mapping come
+    from the OS page cache, so processes mapping the same file share them
+    instead of each reading its own copy.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        The mapping, to be closed by the caller, or None if the file can not
+        be mapped (eg. an empty file).
+    """
+    try:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def fileHash(path: str) -> str:
+    """fileHash. Creates the SHA-256 hash of a file's content, read through a
+    memory mapping. Hashes are kept per process, keyed by the file's device,
+    inode, modification time and size, so a file is hashed once however many
+    times it is needed (cache keys, manifests, placing fonts). Only the
+    `HASH_MEMO_SIZE` most recently used hashes are kept.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        Hex digest of file content.
+    """
+    stat = os.stat(path)
+    signature = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _hashesLock:
+        digest = _hashes.get(signature)
+        if digest != None:
+            _hashes.move_to_end(signature)
+            return digest
+    mapping = mapFile(path)
+    if mapping != None:
+        with mapping:
+            digest = hashlib.sha256(mapping).hexdigest()
+    else:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+    with _hashesLock:
+        _hashes[signature] = digest
+        while len(_hashes) > HASH_MEMO_SIZE:
+            _hashes.popitem(last=False)
+    return digest
+
+
+def isCached(path: str) -> bool:
+    """isCached. Whether a file is kept in a cache directory used by this
+    process (the default one included), eg. a subset or decompressed web
+    font, which may be evicted or removed at exit.
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        True if the file is in a cache directory.
+    """
+    real = os.path.realpath(path)
+    roots = _roots | {os.path.realpath(cacheDir())}
+    return any(real.startswith(root + os.sep) for root in roots)
+
+
+def cacheKey(*parts) -> str:
+    """cacheKey. Combines file hashes and options to a single key. gensty and
+    cache format versions are always part of the key.
+
+    Args:
+        parts: Any values identifying the cached entry.
+
+    Returns:
+        Hex digest used as key.
+    """
+    values = [__version__, CACHE_VERSION] + [str(part) for part in parts]
+    return hashlib.sha256("\0".join(values).encode("utf-8")).hexdigest()
+
+
+class Cache:
+    """Cache. Stores JSON or binary entries as separate files, one per key,
+    under a namespace folder of the cache directory. Access time is kept on
+    the file modification time, so when the namespace exceeds `maxSize` the
+    least recently used entries are evicted first.
+
+    Attributes:
+        path (str): Namespace folder of the cache.
+        maxSize (int): Maximum size of namespace in bytes.
+        deferred (bool): Entries are not evicted when stored, see
+        :func:`~gensty.cache.Cache.deferEviction`.
+    """
+
+    def __init__(self, namespace: str = "metadata", path: str = None,
+                 maxSize: int = CACHE_MAX_SIZE) -> None:
+        """__init__. Constructor.
+
+        Args:
+            namespace (str): Cache namespace (sub folder).
+            path (str, optional): Cache directory, defaults to
+            :func:`~gensty.cache.cacheDir`.
+            maxSize (int, optional): Maximum size of namespace in bytes.
+        """
+        if path == None:
+            path = cacheDir()
+        self.root: str = path
+        _roots.add(os.path.realpath(path))
+        self.path: str = os.path.join(path, namespace)
+        self.maxSize: int = maxSize
+        self.deferred: bool = False
+
+    def __entry(self, key: str, ext: str = "json") -> str:
+        return os.path.join(self.path, key + "." + ext)
+
+    def get(self, key: str) -> Union[dict, None]:
+        """get. Retrieves a cached entry and marks it as recently used.
+
+        Args:
+            key (str): Entry key.
+
+        Returns:
+            The cached entry or None.
+        """
+        entry = self.__entry(key)
+        try:
+            with open(entry, encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def set(self, key: str, value: dict):
+        """set. Stores an entry, replacing atomically any previous one, and
+        evicts old entries if needed.
+
+        Args:
+            key (str): Entry key.
+            value (dict): JSON serializable entry.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        entry = self.__entry(key)
+        tmp = "%s.%d.tmp" % (entry, os.getpid())
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, separators=(",", ":"))
+        os.replace(tmp, entry)
+        if self.deferred == False:
+            self.evict()
+
+    def getBytes(self, key: str) -> Union[bytes, None]:
+        """getBytes. Retrieves a binary cached entry and marks it as recently
+        used.
+
+        Args:
+            key (str): Entry key.
+
+        Returns:
+            The cached content or None.
+        """
+        entry = self.__entry(key, "bin")
+        try:
+            with open(entry, "rb") as f:
+                value = f.read()
+            os.utime(entry)
+        except OSError:
+            return None
+        return value
+
+    def setBytes(self, key: str, value: bytes):
+        """setBytes. Stores a binary entry, replacing atomically any previous
+        one, and evicts old entries if needed.
+
+        Args:
+            key (str): Entry key.
+            value (bytes): Entry content.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        entry = self.__entry(key, "bin")
+        tmp = "%s.%d.tmp" % (entry, os.getpid())
+        with open(tmp, "wb") as f:
+            f.write(value)
+        os.replace(tmp, entry)
+        if self.deferred == False:
+            self.evict()
+
+    def getFile(self, key: str, filename: str) -> Union[str, None]:
+        """getFile. Retrieves the path of a cached file, kept with its own
+        file name in a folder named after the key, and marks it as recently
+        used.
+
+        Args:
+            key (str): Entry key.
+            filename (str): File name.
+
+        Returns:
+            The cached file path or None.
+        """
+        entry = os.path.join(self.path, key)
+        path = os.path.join(entry, filename)
+        if not os.path.isfile(path):
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return path
+
+    def setFile(self, key: str, filename: str, source: str) -> str:
+        """setFile. Moves a file into the cache, under a folder named after
+        the key, and evicts old entries if needed.
+
+        Args:
+            key (str): Entry key.
+            filename (str): File name in cache.
+            source (str): File to move, on the same filesystem as cache.
+
+        Returns:
+            The cached file path.
+        """
+        entry = os.path.join(self.path, key)
+        tmp = "%s.%d.tmp" % (entry, os.getpid())
+        os.makedirs(tmp, exist_ok=True)
+        os.replace(source, os.path.join(tmp, filename))
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # another process cached the same entry meanwhile.
+            shutil.rmtree(tmp, ignore_errors=True)
+        if self.deferred == False:
+            self.evict()
+        return os.path.join(entry, filename)
+
+    def evict(self):
+        """evict. Removes the least recently used entries until the namespace
+        fits in `maxSize`. The most recently used entry is always kept."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.path) as it:
+                for item in it:
+                    try:
+                        stat = item.stat()
+                        size = stat.st_size
+                        if item.is_dir():
+                            size = sum(sub.stat().st_size
+                                       for sub in os.scandir(item.path))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, size, item.path))
+                    total += size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, entry in entries[:-1]:
+            if total <= self.maxSize:
+                break
+            try:
+                if os.path.isdir(entry):
+                    shutil.rmtree(entry)
+                else:
+                    os.remove(entry)
+            except OSError:
+                pass
+            total -= size
+
+    @contextmanager
+    def deferEviction(self):
+        """deferEviction. Keeps every entry stored in the enclosed block, in
+        any namespace, until the block ends, eg. subsets created during a run
+        until they are copied into packages. Namespaces created from this
+        cache, also in worker processes, share the deferral. All namespaces
+        are evicted at the end."""
+        deferred = self.deferred
+        self.deferred = True
+        try:
+            yield self
+        finally:
+            self.deferred = deferred
+            if deferred == False:
+                try:
+                    namespaces = [item.name for item in os.scandir(self.root)
+                                  if item.is_dir()]
+                except OSError:
+                    namespaces = []
+                for namespace in namespaces:
+                    self.namespace(namespace).evict()
+
+    def namespace(self, namespace: str) -> "Cache":
+        """namespace. Creates a cache sharing the same directory, size limit
+        and eviction deferral, for a different namespace.
+
+        Args:
+            namespace (str): Cache namespace (sub folder).
+
+        Returns:
+            The namespace cache.
+        """
+        cache = Cache(namespace, self.root, self.maxSize)
+        cache.deferred = self.deferred
+        return cache
+
+    def clear(self):
+        """clear. Removes the whole cache directory, all namespaces."""
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root, ignore_errors=True)
@@ -5,67 +5,478 @@ import os
 import sys
 import shutil
 import argparse
+import threading
+import tracemalloc
+from itertools import chain, islice
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from gensty.helpers import checkExtension, createDir, writePackage, checkFont
-from gensty.helpers import getFontsByType
-from gensty.config import __version__, FONTDIR, SUPPORTED_FONTS
+from gensty.helpers import copyFont, bundleNames
+from gensty.helpers import discoverFonts
+from gensty.config import __version__, FONTDIR, SUPPORTED_FONTS, BACKENDS
+from gensty.config import FONT_LINKS, IO_JOBS, FONT_COLLECTIONS, WEB_FONTS
+from gensty.config import LRU_SIZE, PRIORITIES
 from gensty.font import LaTeXstyle
+from gensty.merge import MergedStyle, SymbolIndex, mergedCommand
+from fontTools import ttLib
+from gensty.cache import Cache, mapFile, temporaryCache
+from gensty.manifest import Manifest, packageKey
+from gensty.smufl import glyphnameIndex
+from gensty.names import nameTable
+from gensty.subset import subsetFont
+from gensty.webfont import sfntFont
+from gensty.watch import Watcher
+from gensty.server import FontLRU, serve, socketPath, styleKey
+from gensty.ranges import parseRanges, blockRanges
+from gensty.timings import Profiler, profiled, capture, emit, enabled
 from datetime import datetime
-from typing import Tuple, List
+from typing import Tuple, List, Iterable, Union
 
+# builds of server requests, which change the working directory.
+_builds = threading.Lock()
 
-def __saveSinglePackage(fontname: str, fontpath: str, content: str):
-    """__saveSinglePackage. Creates a single package folder and its files and
-    save thes to disk.
+
+def __packageDir(path: str, incremental: bool = False):
+    """__packageDir. Creates a package folder. Existing folders are removed
+    first, unless the package is updated incrementally.
+
+    Args:
+        path (str): Folder path.
+        incremental (bool): Keep existing folder.
+    """
+    if incremental == True:
+        os.makedirs(path, exist_ok=True)
+    else:
+        createDir(path)
+
+
+def __packageFolder(fontname: str, fontfile: str = None) -> str:
+    """__packageFolder. The package folder of a font, named after the font.
+    The faces of a font collection share one folder, named after the
+    collection file, so the collection is bundled once.
 
     Args:
         fontname (str): The font name.
+        fontfile (str, optional): The bundled font file.
+
+    Returns:
+        Folder path.
+    """
+    if fontfile != None and checkFont(fontfile, FONT_COLLECTIONS) == True:
+        stem = os.path.splitext(os.path.basename(fontfile))[0]
+        return stem.replace(" ", "").replace("-", "")
+    return fontname
+
+
+def __styleFolder(pkg: LaTeXstyle, subset: bool = False) -> str:
+    """__styleFolder. The package folder of a prepared font, see
+    :func:`~gensty.cli.__packageFolder`.
+
+    Args:
+        pkg (LaTeXstyle): Prepared font.
+        subset (bool): Whether fonts are subset. Subsets of collection faces
+        are bundled in a package per face.
+
+    Returns:
+        Folder path.
+    """
+    return __packageFolder(pkg.name, None if subset == True else pkg.fontfile)
+
+
+@profiled("savePackage", lambda folder, *args, **kwargs: folder)
+def __saveSinglePackage(folder: str, fontpath: str, names: list,
+                        contents: list, key: str = None, link: str = "copy"):
+    """__saveSinglePackage. Creates a single package folder and its files and
+    save thes to disk. The folder holds one style file per font name (more
+    than one for the faces of a font collection).
+
+    Args:
+        folder (str): The package folder.
         fontpath (str): The path to font file.
-        content (str): LaTeX Style content.
+        names (list): The font names.
+        contents (list): LaTeX Style content per font name, either a string,
+        an iterable of chunks, or a list of file names and contents for split
+        packages.
+        key (str, optional): Package key, if provided the package is updated
+        incrementally and its manifest is recorded.
+        link (str, optional): How the font is placed, see
+        :func:`~gensty.helpers.copyFont`.
+    """
+    incremental = key != None
+    __packageDir(folder, incremental)
+    packageFontsPath = folder + "/" + FONTDIR
+    __packageDir(packageFontsPath, incremental)
+    outputs = {}
+    outputs[FONTDIR + "/" + os.path.basename(fontpath)] = copyFont(
+        fontpath, packageFontsPath, link)
+    for fontname, content in zip(names, contents):
+        if isinstance(content, list):
+            for filename, part in content:
+                stem, extension = os.path.splitext(filename)
+                outputs[filename] = writePackage(folder+"/"+stem, part,
+                                                 extension[1:])
+        else:
+            outputs[fontname + ".sty"] = writePackage(folder+"/"+fontname,
+                                                      content)
+    if incremental == True:
+        Manifest(folder).record(key, outputs)
+
+
+def __saveFolder(folder: str, packages: list, link: str = "copy"):
+    """__saveFolder. Saves the packages sharing a folder one after the other,
+    so they never write the folder concurrently; the last one is kept, as
+    when saved one by one.
+
+    Args:
+        folder (str): The package folder.
+        packages (list): Font path, font names, contents and key of every
+        package, see :func:`~gensty.cli.__saveSinglePackage`.
+        link (str, optional): How fonts are placed, see
+        :func:`~gensty.helpers.copyFont`.
+    """
+    for fontpath, names, contents, key in packages:
+        __saveSinglePackage(folder, fontpath, names, contents, key, link)
+
+
+@profiled("savePackage", lambda packageName, *args, **kwargs: packageName)
+def __saveMergedPackage(packageName: str, fontfiles: list, files: list,
+                        key: str = None, link: str = "copy",
+                        executor: ThreadPoolExecutor = None):
+    """__saveMergedPackage. Creates one package folder for all fonts and
+    saves it to disk.
+
+    Args:
+        packageName (str): The package name.
+        fontfiles (list): The paths to font files.
+        files (list): Style files, the last one being the package.
+        key (str, optional): Package key, if provided the package is updated
+        incrementally and its manifest is recorded.
+        link (str, optional): How fonts are placed, see
+        :func:`~gensty.helpers.copyFont`.
+        executor (ThreadPoolExecutor): Pool placing fonts concurrently.
+    """
+    incremental = key != None
+    __packageDir(packageName, incremental)
+    fontpath = packageName + "/" + FONTDIR
+    __packageDir(fontpath, incremental)
+    outputs = {}
+    if len(fontfiles) > 0 and len(files) > 0:
+        # faces of a collection are bundled once, fonts sharing a file name
+        # are renamed as in the package, see __mergePackage.
+        bundled = dict(zip(fontfiles, bundleNames(fontfiles)))
+        copies = [(FONTDIR + "/" + name,
+                   executor.submit(copyFont, font, fontpath, link, name))
+                  for font, name in bundled.items()]
+        # only the last style file is kept, the previous ones are overwritten.
+        outputs[packageName + ".sty"] = writePackage(
+            packageName+"/"+packageName, files[min(len(fontfiles),
+                                                   len(files)) - 1])
+        for output, copy in copies:
+            outputs[output] = copy.result()
+    else:
+        raise Exception("Unknown Error!")
+    if incremental == True:
+        Manifest(packageName).record(key, outputs)
+
+
+def stalePackages(fonts: List[LaTeXstyle], packageName: str = None,
+                  smufl: str = None, templates: str = None, **options) -> Tuple[List[LaTeXstyle], List[str]]:
+    """stalePackages. Filters out the fonts whose packages are up to date,
+    according to the manifest saved in package folder.
+
+    Args:
+        fonts (List[LaTeXstyle]): Prepared fonts.
+        packageName (str, optional): Package name, in case of one package.
+        smufl (str, optional): SMuFL glyphnames.json definition.
+        templates (str, optional): Directory of user templates.
+        options: Generation options (version, author, forced command etc.)
+
+    Returns:
+        The fonts to regenerate and the package keys, to be passed to
+        :func:`~gensty.cli.savePackage`.
+    """
+    if packageName != None and packageName != "":
+        key = packageKey([pkg.fontfile for pkg in fonts], smufl, templates,
+                         packageName=packageName, **options)
+        if Manifest(packageName).isFresh(key):
+            return [], []
+        return fonts, [key]
+
+    stale = []
+    keys = []
+    for pkg in fonts:
+        key = packageKey([pkg.fontfile], smufl, templates, **options)
+        if not Manifest(__styleFolder(pkg, options.get('subset'))).isFresh(key):
+            stale.append(pkg)
+            keys.append(key)
+    return stale, keys
+
+
+def __makeStyle(job: tuple) -> Tuple[str, List[LaTeXstyle], str]:
+    """__makeStyle. Creates the LaTeXstyle instances of a font file, one per
+    face for font collections. Collections are opened once, from a memory
+    mapping, and their faces share the decoded tables. Web fonts are
+    decompressed first, see :func:`~gensty.webfont.sfntFont`. Runs either in
+    the current process or in a worker of the process pool.
+
+    Args:
+        job (tuple): Keyword arguments of :func:`~gensty.font.LaTeXstyle` and
+        the cache of decompressed web fonts.
+
+    Returns:
+        The font file, the LaTeXstyle instances and None, or the font file,
+        None and the error message.
+    """
+    options, webCache = job
+    fontfile = options['fontfile']
+    try:
+        if checkFont(fontfile, WEB_FONTS) == True:
+            options = dict(options, fontfile=sfntFont(fontfile, webCache))
+        if checkFont(options['fontfile'], FONT_COLLECTIONS) == False:
+            return fontfile, [LaTeXstyle(**options)], None
+        mapping = mapFile(options['fontfile'])
+        collection = ttLib.TTCollection(
+            mapping if mapping != None else options['fontfile'], lazy=True,
+            shareTables=True)
+        try:
+            return fontfile, [LaTeXstyle(fontNumber=idx, font=font, **options)
+                              for idx, font in enumerate(collection.fonts)], None
+        finally:
+            collection.close()
+            if mapping != None:
+                mapping.close()
+    except Exception as e:
+        return fontfile, None, "%s: %s" % (type(e).__name__, e)
+
+
+def __renderStyle(pkg: LaTeXstyle) -> Tuple[str, str, str]:
+    """__renderStyle. Renders the three parts of a LaTeX style package.
+
+    Args:
+        pkg (LaTeXstyle): Prepared LaTeXstyle instance.
+
+    Returns:
+        Header, commands definition and commands.
+    """
+    return pkg.Header(), pkg.DefCommands(), pkg.Commands() or ""
+
+
+def __splitStyle(pkg: LaTeXstyle) -> List[Tuple[str, str]]:
+    """__splitStyle. Renders a split LaTeX style package.
+
+    Args:
+        pkg (LaTeXstyle): Prepared LaTeXstyle instance.
+
+    Returns:
+        File names and contents, see
+        :func:`~gensty.font.LaTeXstyle.SplitFiles`.
+    """
+    return pkg.SplitFiles()
+
+
+def __subsetStyle(options: tuple) -> str:
+    """__subsetStyle. Subsets a font to the codepoints of its package.
+
+    Args:
+        options (tuple): Font file, codepoints, cache and face index.
+
+    Returns:
+        Path to subset font file.
+    """
+    return subsetFont(*options)
+
+
+def __timedJob(job: tuple) -> tuple:
+    """__timedJob. Applies a function in a worker process, collecting the
+    records of its phases, see :func:`~gensty.timings.capture`.
+
+    Args:
+        job (tuple): Function, item and whether allocations are traced.
+
+    Returns:
+        The result and the phase records.
     """
-    createDir(fontname)
-    packageFontsPath = fontname + "/" + FONTDIR
-    createDir(packageFontsPath)
-    shutil.copy2(fontpath, packageFontsPath)
-    writePackage(fontname+"/"+fontname, content)
+    func, item, memory = job
+    with capture(memory) as records:
+        result = func(item)
+    return result, records
+
+
+def __mapJobs(func, items: Iterable, jobs: int = 1) -> list:
+    """__mapJobs. Applies `func` to every item, keeping the items order. With
+    more than one job, items are processed in a pool of processes, each one
+    as soon as it is produced by `items`.
+
+    Args:
+        func: Module level function to apply.
+        items (Iterable): Items to process, eg. a generator.
+        jobs (int): Number of worker processes, 0 means one per CPU.
+
+    Returns:
+        A list of results in the same order as `items`.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    items = iter(items)
+    first = list(islice(items, 2))
+    if jobs <= 1 or len(first) <= 1:
+        return list(map(func, chain(first, items)))
+    items = chain(first, items)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if not enabled():
+            return list(executor.map(func, items))
+        # phases of workers are reported back to the hooks of this process.
+        memory = tracemalloc.is_tracing()
+        results = []
+        for result, records in executor.map(
+                __timedJob, ((func, item, memory) for item in items)):
+            for record in records:
+                emit(record)
+            results.append(result)
+        return results
+
+
+def __fontJobs(fontfiles: Iterable[str], options: dict,
+               cache: Cache = None) -> Iterable[tuple]:
+    """__fontJobs. Creates the jobs of :func:`~gensty.cli.__makeStyle`, while
+    font files are discovered.
+
+    Args:
+        fontfiles (Iterable[str]): Font files.
+        options (dict): Keyword arguments of :func:`~gensty.font.LaTeXstyle`,
+        except the font file.
+        cache (Cache, optional): Cache of parsed fonts.
+
+    Yields:
+        LaTeXstyle keyword arguments and the cache of decompressed web fonts.
+    """
+    for ffile in fontfiles:
+        webCache = cache
+        # created here, so the temporary cache outlives the workers.
+        if webCache == None and checkFont(ffile, WEB_FONTS) == True:
+            webCache = temporaryCache()
+        yield dict(options, fontfile=ffile), webCache
 
 
 def prepareFonts(path: str, ver: str = None, author: str = None,
-                 smufl: str = None) -> List[LaTeXstyle]:
-    """prepareFonts. Creates font.latexStyle instances in a list.
+                 smufl: str = None, jobs: int = 1,
+                 errors: list = None, cache: Cache = None,
+                 templates: str = None, ranges: List[Tuple[int, int]] = None,
+                 blocks: List[str] = None,
+                 private: bool = True, recursive: bool = False,
+                 include: List[str] = None, exclude: List[str] = None,
+                 followSymlinks: bool = False, minSize: int = None,
+                 maxSize: int = None, sources: dict = None) -> List[LaTeXstyle]:
+    """prepareFonts. Creates font.latexStyle instances in a list. Fonts of a
+    directory are parsed while discovered, see
+    :func:`~gensty.helpers.discoverFonts`.
 
     Args:
-        path (str): Either font(s) path directory or path to font file.
+        path (str, List[str]): Either font(s) path directory, path to font
+        file or a list of font files.
         ver (str, optional): LaTeX package version.
         author (str, optional): Latex package author.
         smufl (str, optional): SMuFL glyphnames.json definition.
+        jobs (int, optional): Number of parallel processes parsing fonts, 0
+        means one per CPU.
+        errors (list, optional): If provided, collects a `(fontfile, message)`
+        tuple for every font that failed, instead of raising an Exception.
+        cache (Cache, optional): Cache of parsed fonts, see
+        :func:`~gensty.cache.Cache`.
+        templates (str, optional): Directory of user templates, overriding
+        the bundled ones with the same file name.
+        ranges (List[Tuple[int,int]], optional): Inclusive codepoint ranges
+        to include, see :func:`~gensty.ranges.parseRanges`.
+        blocks (List[str], optional): Unicode blocks to include.
+        private (bool, optional): Allow private symbols.
+        recursive (bool, optional): Finds fonts in subfolders too.
+        include (List[str], optional): Glob patterns of fonts to include.
+        exclude (List[str], optional): Glob patterns of fonts and folders to
+        exclude.
+        followSymlinks (bool, optional): Descends into linked folders.
+        minSize (int, optional): Skips font files smaller than `minSize` bytes.
+        maxSize (int, optional): Skips font files larger than `maxSize` bytes.
+        sources (dict, optional): If provided, collects the LaTeXstyle
+        instances of every font file, by font file (as discovered).
     Returns:
         A list of :func:`~gensty.font.LaTeXstyle` instances containing all data
         needed final package generation.
     """
-    fonts = []
-
-    if os.path.isdir(path) == True:
-        fontfiles = getFontsByType(path, SUPPORTED_FONTS)
-        for ffile in fontfiles:
-            fonts.append(LaTeXstyle(
-                version=ver, author=author, fontfile=ffile, smufl=smufl))
+    if isinstance(path, list):
+        fontfiles = path
+    elif os.path.isdir(path) == True:
+        fontfiles = discoverFonts(path, SUPPORTED_FONTS, recursive, include,
+                                  exclude, followSymlinks, minSize, maxSize)
     elif checkFont(path, SUPPORTED_FONTS) == True:
-        fonts.append(LaTeXstyle(
-            version=ver, author=author, fontfile=path, smufl=smufl))
+        fontfiles = [path]
     else:
         raise Exception("Unhandled operation!")
+
+    # fails early on unknown blocks, instead of once per font.
+    blockRanges(blocks or [])
+
+    # glyphnames and Unicode names are loaded once, before workers share them.
+    if smufl != None and checkExtension(smufl, "json") == True:
+        glyphnameIndex(smufl, cache)
+    elif cache != None:
+        nameTable(cache)
+
+    fonts = []
+    failed = []
+    options = {
+        'version': ver, 'author': author, 'templates': templates,
+        'smufl': smufl, 'cache': cache, 'ranges': ranges,
+        'blocks': blocks, 'private': private,
+    }
+    for ffile, styles, error in __mapJobs(
+            __makeStyle, __fontJobs(fontfiles, options, cache), jobs):
+        if error != None:
+            failed.append((ffile, error))
+        else:
+            fonts.extend(styles)
+            if sources != None:
+                sources[ffile] = styles
+
+    if errors != None:
+        errors.extend(failed)
+    elif len(failed) > 0:
+        raise Exception("Error! Could not parse fonts:\n" + "\n".join(
+            "%s: %s" % (ffile, error) for ffile, error in failed))
     return fonts
 
 
-def makePackage(fonts: str, packageName: str = None, forcedCommand: str = None) -> Tuple[List[str], List[str], List[str]]:
+def makePackage(fonts: str, packageName: str = None, forcedCommand: str = None,
+                jobs: int = 1, stream: bool = False, subset: bool = False,
+                cache: Cache = None, split: bool = False,
+                backend: str = "macros", priority: str = "first",
+                merged: list = None) -> Tuple[List[str], List[str], List[str]]:
     """makePackage.
 
     Args:
         fonts (str): Font(s) path, either a file path or directory.
         packageName (str, optional): Forced package name which overrides the
-        font name in folders and paths.
+        font name in folders and paths. All fonts are merged in this package,
+        see :class:`~gensty.merge.MergedStyle`.
         forcedCommand (str, optional): Overrides the name of generated
         LaTeX command.
+        jobs (int, optional): Number of parallel processes rendering
+        packages, 0 means one per CPU.
+        stream (bool, optional): Instead of strings, style files are returned
+        as iterators of chunks, rendered lazily while written to disk by
+        :func:`~gensty.cli.savePackage`. Ignores `jobs` for rendering.
+        subset (bool, optional): Bundles a subset of each font, including only
+        the codepoints of package. Returned filenames point to the subsets.
+        cache (Cache, optional): Cache holding the subsets.
+        split (bool, optional): Creates split packages, loading symbols on
+        demand. Every style file is then a list of file names and contents,
+        see :func:`~gensty.font.LaTeXstyle.SplitFiles`.
+        backend (str, optional): How symbols are stored in LaTeX, see
+        :func:`~gensty.font.LaTeXstyle.setBackend`.
+        priority (str, optional): Which font defines a symbol found in several
+        fonts of a merged package, see :class:`~gensty.merge.SymbolIndex`.
+        merged (list, optional): If provided, collects the
+        :class:`~gensty.merge.MergedStyle` of a merged package, eg. to report
+        its symbol index.
 
     Returns:
         Three lists (triplet) of string containing Fontnames, Filenames and
@@ -73,37 +484,93 @@ def makePackage(fonts: str, packageName: str = None, forcedCommand: str = None)
     """
     if not isinstance(fonts, list) or len(fonts) == 0:
         raise Exception("Error. Please provide list of LaTeXstyle instances!")
+    if split == True and packageName != None and packageName != "":
+        raise Exception("Error. Split packages can not be merged in one package!")
 
     files = []
     fontfiles = []
     names = []
+    for pkg in fonts:
+        if packageName != None and packageName != "":
+            pkg.setPackage(packageName)
+        pkg.setCommand(forcedCommand)
+        pkg.setBackend(backend)
+        fontfiles.append(pkg.fontfile)
+        names.append(pkg.name)
+
     if packageName != None and packageName != "":
-        header = ""
-        defcommands = ""
-        commands = ""
+        return __mergePackage(fonts, packageName, forcedCommand, jobs, stream,
+                              subset, cache, backend, priority, merged)
+
+    if subset == True:
+        # the temporary cache is created here, so it outlives the workers.
+        fontfiles = __mapJobs(__subsetStyle, [
+            (pkg.fontfile, pkg.codepoints.codepoints,
+             cache or temporaryCache(),
+             pkg.fontNumber) for pkg in fonts], jobs)
+        for pkg, fontfile in zip(fonts, fontfiles):
+            pkg.setBundle(fontfile)
+
+    if split == True:
+        return names, fontfiles, __mapJobs(__splitStyle, fonts, jobs)
+
+    if stream == True:
         for pkg in fonts:
-            pkg.setPackage(packageName)
-            pkg.setCommand(forcedCommand)
-            header = pkg.Header()
-            defcommands += pkg.DefCommands()
-            commands += pkg.Commands()
-            fontfiles.append(pkg.fontfile)
-            names.append(pkg.name)
+            files.append(pkg.iterFile())
+        return names, fontfiles, files
+
+    for header, defcommands, commands in __mapJobs(__renderStyle, fonts, jobs):
         files.append(header + defcommands + commands)
-    else:
-        for pkg in fonts:
-            pkg.setCommand(forcedCommand)
-            header = pkg.Header()
-            defcommands = pkg.DefCommands()
-            commands = pkg.Commands()
-            files.append(header + defcommands + commands)
-            fontfiles.append(pkg.fontfile)
-            names.append(pkg.name)
 
     return names, fontfiles, files
 
 
-def savePackage(names: list, fontfiles: list, files: list, packageName:str = None):
+def __mergePackage(fonts: List[LaTeXstyle], packageName: str,
+                   forcedCommand: str, jobs: int, stream: bool, subset: bool,
+                   cache: Cache, backend: str, priority: str,
+                   collected: list = None) -> Tuple[List[str], List[str], List[str]]:
+    """__mergePackage. Merges fonts in one package, each symbol defined once,
+    see :class:`~gensty.merge.MergedStyle`. Only the fonts defining any
+    symbol are bundled, subset to those symbols if requested.
+
+    Args:
+        fonts (List[LaTeXstyle]): Prepared fonts.
+        packageName (str): Package name.
+        forcedCommand (str): Command name, the package name if None.
+        jobs (int): Number of parallel processes subsetting fonts.
+        stream (bool): Returns the style file as an iterator of chunks.
+        subset (bool): Bundles font subsets.
+        cache (Cache): Cache holding the subsets.
+        backend (str): How symbols are stored in LaTeX.
+        priority (str): Priority rule of symbol index.
+        collected (list, optional): Collects the merged style.
+
+    Returns:
+        Fontnames, Filenames and the merged style file, see
+        :func:`~gensty.cli.makePackage`.
+    """
+    merged = MergedStyle(fonts, packageName, forcedCommand, priority, backend)
+    if collected != None:
+        collected.append(merged)
+    bundled = merged.bundledFonts()
+    if len(bundled) == 0:
+        raise Exception("Error. Fonts do not include any symbol!")
+    names = [pkg.name for pkg, _ in bundled]
+    fontfiles = [pkg.fontfile for pkg, _ in bundled]
+    if subset == True:
+        fontfiles = __mapJobs(__subsetStyle, [
+            (pkg.fontfile, codepoints, cache or temporaryCache(),
+             pkg.fontNumber) for pkg, codepoints in bundled], jobs)
+    # different fonts may share a file name, eg. two versions of a font.
+    for (pkg, _), name in zip(bundled, bundleNames(fontfiles)):
+        pkg.setBundle(name, None if subset == True else pkg.fontNumber)
+    if stream == True:
+        return names, fontfiles, [merged.iterFile()]
+    return names, fontfiles, [merged.File()]
+
+
+def savePackage(names: list, fontfiles: list, files: list, packageName:str = None,
+                keys: list = None, link: str = "copy", ioJobs: int = IO_JOBS):
     """savePackage. Saves packages to disk, creating the appropriate folder
     structure. There are four cases:
 
@@ -112,47 +579,436 @@ def savePackage(names: list, fontfiles: list, files: list, packageName:str = Non
     - Single font, named package. Overrides the default font name on folders.
     - Multiple font, named package. Saves all fonts in same dir.
 
+    Faces of a font collection share a package folder, named after the
+    collection file, with one style file per face and the collection bundled
+    once.
+
+    Files are written to a temporary file, renamed over the destination only
+    when their content changes. Packages are saved concurrently, in a pool of
+    `ioJobs` threads.
+
     Args:
         names (list): A list of  `str`
         fontfiles (list): fontfiles
-        files (list): files
+        files (list): files, either strings or iterables of chunks.
         packageName (str): packageName
+        keys (list): Package keys created by
+        :func:`~gensty.cli.stalePackages`. If provided, package folders are
+        updated incrementally instead of recreated, and their manifest is
+        recorded.
+        link (str): How fonts are placed in packages: `copy`, `hardlink`,
+        `symlink` or `reflink`, see :func:`~gensty.helpers.copyFont`.
+        ioJobs (int): Number of threads writing files.
     """
-    if packageName != None and packageName != "":
-        createDir(packageName)
-        fontpath = packageName + "/" + FONTDIR
-        createDir(fontpath)
-        if len(fontfiles) > 0 and len(files) > 0:
-            for idx, font in enumerate(fontfiles):
-                shutil.copy2(font, fontpath)
-                if idx in range(-len(files), len(files)):
-                    writePackage(packageName+"/"+packageName, files[idx])
+    if link not in FONT_LINKS:
+        raise Exception("Error! Unknown font link %s, choose one of: %s" % (
+            link, ", ".join(FONT_LINKS)))
+    incremental = keys != None
+    with ThreadPoolExecutor(max_workers=max(ioJobs, 1)) as executor:
+        if packageName != None and packageName != "":
+            __saveMergedPackage(packageName, fontfiles, files,
+                                keys[0] if incremental else None, link,
+                                executor)
         else:
-            raise Exception("Unknown Error!")
+            folders = {}
+            for idx in range(len(files)):
+                # faces of a collection share its package, any other font
+                # has a package of its own.
+                package = fontfiles[idx] if checkFont(
+                    fontfiles[idx], FONT_COLLECTIONS) == True else idx
+                folders.setdefault(__packageFolder(names[idx], fontfiles[idx]),
+                                   {}).setdefault(package, []).append(idx)
+            saved = [executor.submit(__saveFolder, folder, [
+                (fontfiles[indices[0]], [names[idx] for idx in indices],
+                 [files[idx] for idx in indices],
+                 keys[indices[0]] if incremental else None)
+                for indices in packages.values()], link)
+                for folder, packages in folders.items()]
+            for future in saved:
+                future.result()
+
+
+def __summary(fonts: List[LaTeXstyle], reportMissing: bool = False,
+              reportDuplicates: bool = False):
+    """__summary. Prints the run summary, the number of generated commands
+    per font, the SMuFL glyphs left out since the font does not include
+    them and the codepoints collapsed because of duplicate names.
+
+    Args:
+        fonts (List[LaTeXstyle]): Generated fonts.
+        reportMissing (bool): Lists the names of missing SMuFL glyphs.
+        reportDuplicates (bool): Lists the collapsed duplicate names.
+    """
+    for pkg in fonts:
+        total = len(pkg.codepoints) + len(pkg.missing)
+        line = "%s: %d commands" % (pkg.name, len(pkg.codepoints))
+        if len(pkg.missing) > 0:
+            line += ", %d SMuFL glyphs not in font (%.1f%% smaller)" % (
+                len(pkg.missing), 100.0 * len(pkg.missing) / total)
+        if len(pkg.duplicates) > 0:
+            line += ", %d duplicate names collapsed" % len(pkg.duplicates)
+        print(line)
+        if reportMissing == True and len(pkg.missing) > 0:
+            print("  Missing: " + ", ".join(
+                "%s (U+%04X)" % (name, code) for code, name in pkg.missing))
+        if reportDuplicates == True and len(pkg.duplicates) > 0:
+            print("  Duplicates: " + ", ".join(
+                "%s (U+%04X)" % (name, code) for code, name in pkg.duplicates))
+
+
+def __mergedSummary(index: SymbolIndex, packageName: str,
+                    reportDuplicates: bool = False):
+    """__mergedSummary. Prints the summary of a merged package, the number
+    of symbols and the definitions left out, since a font ranked higher
+    defines the same name.
+
+    Args:
+        index (SymbolIndex): Symbol index of package.
+        packageName (str): Package name.
+        reportDuplicates (bool): Lists the symbols left out.
+    """
+    used = {idx for idx, _ in index.symbols.values()}
+    line = "%s: %d symbols from %d fonts" % (packageName, len(index.symbols),
+                                             len(used))
+    if len(index.overridden) > 0:
+        line += ", %d duplicate definitions left out" % len(index.overridden)
+    print(line)
+    if reportDuplicates == True and len(index.overridden) > 0:
+        print("  Overridden: " + ", ".join(
+            "%s (U+%04X, %s)" % (name, code, index.fonts[idx].name)
+            for idx, code, name in index.overridden))
+
+
+def __parseSize(size: str) -> int:
+    """__parseSize. Parses a file size, in bytes or with a K, M or G suffix.
+
+    Args:
+        size (str): File size, eg. 512K.
+
+    Returns:
+        Size in bytes.
+    """
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    size = size.strip().upper().rstrip("B")
+    try:
+        if size[-1:] in units:
+            return int(float(size[:-1]) * units[size[-1]])
+        return int(size)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid size '%s'" % size)
+
+
+def __prepare(args: argparse.Namespace, cache: Cache,
+              ranges: List[Tuple[int, int]], blocks: List[str],
+              path: Union[str, List[str]],
+              sources: dict = None) -> List[LaTeXstyle]:
+    """__prepare. Prepares fonts according to the console arguments, printing
+    the fonts which could not be parsed.
+
+    Args:
+        args (argparse.Namespace): Parsed console arguments.
+        cache (Cache): Cache of parsed fonts, None if disabled.
+        ranges (List[Tuple[int,int]]): Parsed codepoint ranges.
+        blocks (List[str]): Unicode blocks.
+        path (str, List[str]): Font file, directory or list of font files.
+        sources (dict, optional): Collects the LaTeXstyle instances per font
+        file.
+
+    Returns:
+        Prepared fonts.
+    """
+    errors = []
+    fonts = prepareFonts(path, args.ver, args.author, args.smufl,
+                         jobs=args.jobs, errors=errors, cache=cache,
+                         templates=args.templates, ranges=ranges,
+                         blocks=blocks, private=not args.no_private,
+                         recursive=args.recursive, include=args.include,
+                         exclude=args.exclude,
+                         followSymlinks=args.follow_symlinks,
+                         minSize=args.min_size, maxSize=args.max_size,
+                         sources=sources)
+    for ffile, error in errors:
+        print("Skipping %s: %s" % (ffile, error), file=sys.stderr)
+    return fonts
+
+
+def __build(args: argparse.Namespace, cache: Cache,
+            ranges: List[Tuple[int, int]], blocks: List[str],
+            fonts: List[LaTeXstyle]):
+    """__build. Generates and saves the packages of prepared fonts according
+    to the console arguments.
+
+    Args:
+        args (argparse.Namespace): Parsed console arguments.
+        cache (Cache): Cache of parsed fonts, None if disabled.
+        ranges (List[Tuple[int,int]]): Parsed codepoint ranges.
+        blocks (List[str]): Unicode blocks.
+        fonts (List[LaTeXstyle]): Prepared fonts.
+    """
+    keys = None
+    if args.incremental == True:
+        fonts, keys = stalePackages(fonts, args.one_package, args.smufl,
+                                    args.templates, version=args.ver, author=args.author,
+                                    forcedCommand=args.force_name,
+                                    priority=args.priority,
+                                    subset=args.subset, split=args.split,
+                                    backend=args.backend,
+                                    link=args.font_link,
+                                    ranges=ranges,
+                                    blocks=blocks,
+                                    private=not args.no_private)
+        if len(fonts) == 0:
+            print("All packages are up to date.")
+            return
+    merged = []
+    # a single process streams packages directly to disk.
+    fontnames, fontfiles, files = makePackage(
+        fonts, args.one_package, args.force_name, jobs=args.jobs,
+        stream=args.jobs == 1, subset=args.subset, cache=cache,
+        split=args.split, backend=args.backend, priority=args.priority,
+        merged=merged)
+    # creates font package with folder stracture etc.
+    savePackage(fontnames, fontfiles, files, packageName=args.one_package,
+                keys=keys, link=args.font_link, ioJobs=args.io_jobs)
+    __summary(fonts, args.report_missing, args.report_duplicates)
+    for style in merged:
+        __mergedSummary(style.index, args.one_package, args.report_duplicates)
+
+
+def __prepareCached(args: argparse.Namespace, cache: Cache,
+                    ranges: List[Tuple[int, int]], blocks: List[str],
+                    lru: FontLRU) -> List[LaTeXstyle]:
+    """__prepareCached. Prepares fonts according to the console arguments,
+    parsing only the fonts missing from the server memory.
+
+    Args:
+        args (argparse.Namespace): Parsed console arguments.
+        cache (Cache): Cache of parsed fonts, None if disabled.
+        ranges (List[Tuple[int,int]]): Parsed codepoint ranges.
+        blocks (List[str]): Unicode blocks.
+        lru (FontLRU): Parsed fonts kept in memory.
+
+    Returns:
+        Prepared fonts.
+    """
+    if os.path.isdir(args.path) == True:
+        fontfiles = list(discoverFonts(
+            args.path, SUPPORTED_FONTS, args.recursive, args.include,
+            args.exclude, args.follow_symlinks, args.min_size, args.max_size))
     else:
-        for idx, pkg in enumerate(files):
-            __saveSinglePackage(names[idx], fontfiles[idx], pkg)
+        fontfiles = [args.path]
+    options = {
+        'version': args.ver, 'author': args.author,
+        'templates': args.templates, 'smufl': args.smufl, 'ranges': ranges,
+        'blocks': blocks, 'private': not args.no_private,
+    }
+    styles = {ffile: lru.get(styleKey(ffile, options)) for ffile in fontfiles}
+    # decompressed web fonts may have been evicted from cache since.
+    misses = [ffile for ffile in fontfiles if styles[ffile] == None or any(
+        not os.path.isfile(pkg.fontfile) for pkg in styles[ffile])]
+    if len(misses) > 0:
+        parsed = {}
+        __prepare(args, cache, ranges, blocks, misses, parsed)
+        for ffile, result in parsed.items():
+            lru.put(styleKey(ffile, options), result)
+            styles[ffile] = result
+    return [pkg for ffile in fontfiles for pkg in styles[ffile] or []]
 
 
-def cli():
-    """cli. Handles console arguments."""
+def __generate(args: argparse.Namespace, cache: Cache,
+               ranges: List[Tuple[int, int]], blocks: List[str],
+               lru: FontLRU = None, cwd: str = None):
+    """__generate. Generates and saves packages according to the console
+    arguments.
+
+    Args:
+        args (argparse.Namespace): Parsed console arguments.
+        cache (Cache): Cache of parsed fonts, None if disabled.
+        ranges (List[Tuple[int,int]]): Parsed codepoint ranges.
+        blocks (List[str]): Unicode blocks.
+        lru (FontLRU, optional): Parsed fonts kept in memory by the server.
+        cwd (str, optional): Working directory of packages, if not the
+        current one.
+    """
+    if lru != None:
+        fonts = __prepareCached(args, cache, ranges, blocks, lru)
+    else:
+        fonts = __prepare(args, cache, ranges, blocks, args.path)
+    if len(fonts) == 0:
+        raise Exception("Error! No font could be parsed.")
+    if cwd == None:
+        __build(args, cache, ranges, blocks, fonts)
+        return
+    # requests are parsed concurrently, but built one at a time.
+    with _builds:
+        previous = os.getcwd()
+        os.chdir(cwd)
+        try:
+            __build(args, cache, ranges, blocks, fonts)
+        finally:
+            os.chdir(previous)
+
+
+def __watch(args: argparse.Namespace, cache: Cache,
+            ranges: List[Tuple[int, int]], blocks: List[str]):
+    """__watch. Generates packages, then keeps the parsed fonts in memory and
+    regenerates only the packages of added or changed fonts, removing the
+    packages of removed fonts, until interrupted.
+
+    Args:
+        args (argparse.Namespace): Parsed console arguments.
+        cache (Cache): Cache of parsed fonts, None if disabled.
+        ranges (List[Tuple[int,int]]): Parsed codepoint ranges.
+        blocks (List[str]): Unicode blocks.
+    """
+    watcher = Watcher(args.path, args.watch_interval, args.debounce,
+                      recursive=args.recursive, include=args.include,
+                      exclude=args.exclude, followSymlinks=args.follow_symlinks,
+                      minSize=args.min_size, maxSize=args.max_size)
+    merged = args.one_package != None and args.one_package != ""
+    sources = {}
+    try:
+        if len(watcher.files) > 0:
+            fonts = __prepare(args, cache, ranges, blocks, list(watcher.files),
+                              sources)
+            if len(fonts) > 0:
+                __build(args, cache, ranges, blocks, fonts)
+        print("Watching %s for changes, press Ctrl+C to stop." % args.path,
+              file=sys.stderr)
+        for added, changed, removed in watcher.changes():
+            previous = [pkg for ffile in changed + removed
+                        for pkg in sources.pop(ffile, [])]
+            fonts = []
+            if len(added) + len(changed) > 0:
+                fonts = __prepare(args, cache, ranges, blocks, added + changed,
+                                  sources)
+            if merged == True:
+                # discovery order, as in the first build, so --priority
+                # resolves shared symbols the same way.
+                fonts = [pkg for ffile in watcher.files
+                         for pkg in sources.get(ffile, [])]
+            else:
+                # packages of removed or renamed fonts.
+                folders = {__styleFolder(pkg, args.subset)
+                           for styles in sources.values() for pkg in styles}
+                for pkg in previous:
+                    folder = __styleFolder(pkg, args.subset)
+                    if folder not in folders and os.path.isdir(folder):
+                        shutil.rmtree(folder)
+                        folders.add(folder)
+                        print("Removed %s" % folder)
+            if len(fonts) > 0:
+                __build(args, cache, ranges, blocks, fonts)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def __parser() -> argparse.ArgumentParser:
+    """__parser. Creates the parser of console arguments.
+
+    Returns:
+        The parser.
+    """
     parser = argparse.ArgumentParser(
         prog='genSty', description="LaTeX Style file generator for fonts")
     parser.add_argument('--version', '-v', action='version',
                         version='%(prog)s ' + __version__)
-    parser.add_argument('path',
+    parser.add_argument('path', nargs='?',
                         help='Font(s) path. It can be either a directory in case of multiple fonts or file path.')
     parser.add_argument('--all', '-a', action="store_true",
                         help='If choosed %(prog)s will generate LaTeX Styles for all fonts in directory')
+    parser.add_argument('--recursive', '-r', action="store_true",
+                        help='Finds fonts in subfolders too.')
+    parser.add_argument('--include', type=str, action="append",
+                        help='Glob pattern of fonts to include, matched against the file name, or the path relative to directory if it contains a "/". Can be repeated.')
+    parser.add_argument('--exclude', type=str, action="append",
+                        help='Glob pattern of fonts or folders to exclude, matched as --include. Can be repeated.')
+    parser.add_argument('--follow-symlinks', action="store_true",
+                        help='Descends into symbolically linked folders when searching recursively.')
+    parser.add_argument('--min-size', type=__parseSize,
+                        help='Skips font files smaller than this size, in bytes or with K, M, G suffix.')
+    parser.add_argument('--max-size', type=__parseSize,
+                        help='Skips font files larger than this size, in bytes or with K, M, G suffix.')
     parser.add_argument('--smufl', '-s', type=str,
                         help='If choosed %(prog)s will generate LaTeX Styles for all fonts in directory based on glyphnames provided.')
+    parser.add_argument('--report-missing', action="store_true",
+                        help='Lists the SMuFL glyphs which are not included in font, thus left out of package.')
+    parser.add_argument('--report-duplicates', action="store_true",
+                        help='Lists the codepoints left out of package, since their name is already used.')
+    parser.add_argument('--ranges', type=str,
+                        help='Includes only the given codepoints and codepoint ranges, eg. U+0370-03FF,U+2200-22FF.')
+    parser.add_argument('--blocks', type=str,
+                        help='Includes only the given, comma separated, Unicode blocks, eg. "Greek and Coptic,Mathematical Operators".')
+    parser.add_argument('--no-private', action="store_true",
+                        help='Excludes Private Use Area symbols (ignored for SMuFL).')
     parser.add_argument('--one-package', type=str,
                         help='Creates one package with name provided by this argument.')
     parser.add_argument('--force-name', type=str,
-                        help='Forces LaTeX command name. Use with cautious in case of simmilar symbols on same package there will be an error.')
+                        help='Forces LaTeX command name, instead of the font name (package name with --one-package).')
+    parser.add_argument('--priority', choices=PRIORITIES, default="first",
+                        help='Which font defines a symbol found in several fonts of --one-package: the first or last font in path order, or the font with most symbols (coverage).')
     parser.add_argument('--author', type=str, help='Author\'s name.')
+    parser.add_argument('--templates', type=str,
+                        help='Directory of user templates (header.sty, defcommands.sty) overriding the bundled ones.')
     parser.add_argument('--ver', type=str, help='LaTeX package version.')
-    args = parser.parse_args()
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of parallel processes parsing fonts and rendering packages, 0 uses all CPUs.')
+    parser.add_argument('--no-cache', action="store_true",
+                        help='Parse every font, without using or updating the cache of parsed fonts.')
+    parser.add_argument('--clear-cache', action="store_true",
+                        help='Clears the cache of parsed fonts before running.')
+    parser.add_argument('--incremental', '-i', action="store_true",
+                        help='Regenerates only packages whose fonts, glyphnames, templates or options changed, keeping the rest untouched.')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default="macros",
+                        help='How symbols are stored in LaTeX: one macro per symbol (macros), a single expl3 property list (expl3) or a single Lua table for LuaLaTeX (lua).')
+    parser.add_argument('--split', action="store_true",
+                        help='Splits every package in a small root package and one file per Unicode block, loaded through package options or, when a symbol is not yet defined, in order until one defines it.')
+    parser.add_argument('--subset', action="store_true",
+                        help='Bundles a subset of each font, including only the symbols defined in package.')
+    parser.add_argument('--font-link', choices=FONT_LINKS, default="copy",
+                        help='How fonts are placed in packages: copied (copy), hard linked (hardlink), symbolically linked to the absolute font path (symlink) or cloned copy-on-write (reflink). Falls back to copy when not supported, and for generated fonts (subsets, decompressed web fonts) instead of symlink.')
+    parser.add_argument('--io-jobs', type=int, default=IO_JOBS,
+                        help='Number of threads writing packages and placing fonts.')
+    parser.add_argument('--watch', '-w', action="store_true",
+                        help='Keeps running after generating packages, regenerating the packages of added or changed fonts and removing those of removed fonts.')
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                        help='Seconds between checks for changed fonts in watch mode (default: 1).')
+    parser.add_argument('--debounce', type=float, default=0.5,
+                        help='Seconds without further changes before packages are regenerated in watch mode (default: 0.5).')
+    parser.add_argument('--serve', nargs='?', const="", metavar='SOCKET',
+                        help='Runs as a server on a Unix socket (default: $GENSTY_SOCKET or gensty.sock in $XDG_RUNTIME_DIR, or in a temporary folder), keeping parsed fonts in memory. Commands are sent with gensty-client, taking the same arguments as gensty.')
+    parser.add_argument('--lru-size', type=int, default=LRU_SIZE,
+                        help='Number of parsed font files the server keeps in memory.')
+    parser.add_argument('--profile', '--timings', nargs='?', const="",
+                        metavar='REPORT',
+                        help='Prints wall time, CPU time and peak memory per phase and the slowest fonts. If a file name is given, the full report is also saved as JSON.')
+    return parser
+
+
+def __run(args: argparse.Namespace, parser: argparse.ArgumentParser,
+          lru: FontLRU = None, cwd: str = None):
+    """__run. Runs a command, according to the console arguments.
+
+    Args:
+        args (argparse.Namespace): Parsed console arguments.
+        parser (argparse.ArgumentParser): The parser, reporting errors.
+        lru (FontLRU, optional): Parsed fonts kept in memory by the server.
+        cwd (str, optional): Working directory of packages, if not the
+        current one.
+    """
+    cache = None if args.no_cache else Cache()
+    if args.clear_cache == True:
+        Cache().clear()
+        if args.path == None:
+            return
+    if args.path == None:
+        parser.error("the following arguments are required: path")
+    if args.one_package and mergedCommand(args.one_package,
+                                          args.force_name) == "":
+        parser.error("argument --one-package: '%s' has no letters for a "
+                     "command name, use --force-name" % args.one_package)
 
     # Handles different cases of command.
     # In case of "all" flag we create styles for every font in folder. For both
@@ -170,9 +1026,80 @@ def cli():
     if args.smufl != None and checkExtension(args.smufl, "json") == False:
         raise Exception("Error! Please provide a valid smufl json file")
 
-    # prepare fonts.
-    fonts = prepareFonts(args.path, args.ver, args.author, args.smufl)
-    fontnames, fontfiles, files = makePackage(
-        fonts, args.one_package, args.force_name)
-    # creates font package with folder stracture etc.
-    savePackage(fontnames, fontfiles, files, packageName=args.one_package)
+    if args.templates != None and os.path.isdir(args.templates) == False:
+        raise Exception("Error! --templates must be a directory.")
+
+    if args.jobs < 0:
+        raise Exception("Error! --jobs must be a positive number or 0.")
+
+    if args.io_jobs < 1:
+        raise Exception("Error! --io-jobs must be a positive number.")
+
+    if args.split == True and args.backend != "macros":
+        raise Exception("Error! --split needs the macros --backend.")
+
+    ranges = parseRanges(args.ranges) if args.ranges != None else None
+    blocks = args.blocks.split(",") if args.blocks != None else None
+
+    profiler = None
+    if args.profile != None:
+        profiler = Profiler()
+        profiler.start()
+    try:
+        # decompressed web fonts and subsets stay in cache until they are
+        # copied into packages.
+        with cache.deferEviction() if cache != None else nullcontext():
+            if args.watch == True:
+                __watch(args, cache, ranges, blocks)
+            else:
+                __generate(args, cache, ranges, blocks, lru, cwd)
+    finally:
+        if profiler != None:
+            profiler.stop()
+            print(profiler.summary(), file=sys.stderr)
+            if args.profile != "":
+                profiler.save(args.profile)
+
+
+def __request(argv: List[str], cwd: str, lru: FontLRU) -> int:
+    """__request. Runs a command sent to the server. Paths are resolved
+    against the working directory of the client.
+
+    Args:
+        argv (List[str]): Console arguments.
+        cwd (str): Working directory of the client.
+        lru (FontLRU): Parsed fonts kept in memory.
+
+    Returns:
+        The exit status.
+    """
+    parser = __parser()
+    args = parser.parse_args(argv)
+    if args.serve != None or args.watch == True:
+        raise Exception("Error! --serve and --watch can not be sent to the server.")
+    # requests run in threads of the server: profiling is process wide, and
+    # forking worker processes from a multithreaded process is unsafe.
+    if args.profile != None:
+        raise Exception("Error! --profile can not be sent to the server.")
+    if args.jobs != 1:
+        raise Exception("Error! --jobs can not be sent to the server, "
+                        "requests run in a single process.")
+    for name in ['path', 'smufl', 'templates', 'profile']:
+        value = getattr(args, name)
+        if value != None and value != "":
+            setattr(args, name, os.path.join(cwd, value))
+    __run(args, parser, lru, cwd)
+    return 0
+
+
+def cli():
+    """cli. Handles console arguments."""
+    parser = __parser()
+    args = parser.parse_args()
+    if args.serve != None:
+        lru = FontLRU(args.lru_size)
+        path = args.serve or socketPath()
+        print("Serving on %s, press Ctrl+C to stop." % path, file=sys.stderr)
+        serve(path, lambda argv, cwd: __request(argv, cwd, lru))
+        return
+    __run(args, parser)
@@ -1,9 +1,31 @@
 """ Config file defines some important globals."""
-SUPPORTED_FONTS     = ['ttf', 'otf']
+SUPPORTED_FONTS     = ['ttf', 'otf', 'ttc', 'otc', 'woff', 'woff2']
+FONT_COLLECTIONS    = ['ttc', 'otc']
+WEB_FONTS           = ['woff', 'woff2']
 LATEX_REQUIREMENTS  = ['fontspec']
 FONTDIR             = "fonts"
 HEADER_TEMPLATE     = 'resources/header.sty'
 COMMANDS_TEMPLATE   = 'resources/defcommands.sty'
+SPLIT_TEMPLATE      = 'resources/defcommands-split.sty'
+BACKENDS            = {
+    'macros': COMMANDS_TEMPLATE,
+    'expl3': 'resources/defcommands-expl3.sty',
+    'lua': 'resources/defcommands-lua.sty',
+}
+FAMILY_TEMPLATE     = 'resources/fontfamily.sty'
+MERGED_BACKENDS     = {
+    'macros': 'resources/merged.sty',
+    'expl3': 'resources/merged-expl3.sty',
+    'lua': 'resources/merged-lua.sty',
+}
+PRIORITIES          = ['first', 'last', 'coverage']
+FONT_LINKS          = ['copy', 'hardlink', 'symlink', 'reflink']
+IO_JOBS             = 4
+LRU_SIZE            = 128
+HASH_MEMO_SIZE      = 4096
+MANIFEST_FILE       = '.gensty-manifest.json'
+CACHE_MAX_SIZE      = 256 * 1024 * 1024
+CACHE_VERSION       = '3'
 __author__          = 'Georgios Tsotsos'
 __email__           = 'tsotsos@gmail.com'
 __version__         = '0.3.1'
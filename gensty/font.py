@@ -2,47 +2,162 @@
 """Gensty fonts. Classes making the essential job for handling font information
 and creating LaTeX style package."""
 import os
-import json
-from fontTools.unicode import Unicode
 from fontTools import ttLib
 from datetime import datetime
-from gensty.helpers import ReplaceToken, checkExtension, checkFont, fixString
-from gensty.config import FONTDIR, SUPPORTED_FONTS, COMMANDS_TEMPLATE, HEADER_TEMPLATE
+from gensty.helpers import checkExtension, checkFont
+from gensty.template import loadTemplate
+from gensty.cache import Cache, cacheKey, fileHash, mapFile
+from gensty.smufl import glyphnameIndex
+from gensty.names import nameTable, latexName, GlyphTable, unicodedata
+from gensty.ranges import RangeIndex, blockRanges, blockName
+from gensty.timings import profiled
+from gensty.config import FONTDIR, SUPPORTED_FONTS, HEADER_TEMPLATE
+from gensty.config import SPLIT_TEMPLATE, FAMILY_TEMPLATE, BACKENDS
 from gensty.config import LATEX_REQUIREMENTS, __author__
-from typing import Tuple, List
+from typing import Tuple, List, Iterator, Dict
 
 
 class Info:
     """Info. Handles opentype fonts (otf, ttf) and creates codepoint/symbol
     (unicode) List of Tuples based either on sMuFL glyphnames.json file or the
     font itself as parsed by fontTools. Additionally the Class retrieves the
-    font name.
+    font name. Faces of font collections (ttc, otc) are selected by
+    `fontNumber`.
 
     Attributes:
-        fontfile (str): The font file (otf,ttf).
+        fontfile (str): The font file (otf,ttf,ttc,otc).
+        fontNumber (int): Face index in font collection, None otherwise.
         name (str): The font name as retrieved from font file.
-        codepoints (List[Tuple[str,str]]): Codepoints and Symbol.
+        codepoints (GlyphTable): Codepoints and Symbol, a sequence of
+        `(codepoint, name)` tuples kept in compact form.
         errors (List[str]): List of error messages.
+        missing (List[Tuple[int,str]]): SMuFL glyphs not included in font.
+        duplicates (List[Tuple[int,str]]): Codepoints left out, since their
+        name is already used by another codepoint.
     """
 
-    def __init__(self, fontfile: str, smufl: str = None) -> None:
+    # no per instance dict, hundreds of fonts may be held at once.
+    __slots__ = ("errors", "missing", "duplicates", "fontfile", "fontNumber",
+                 "name", "codepoints", "__smufl", "__font", "__mapping",
+                 "__shared", "__cache", "__private", "__filter", "__cacheKey")
+
+    @profiled("Info")
+    def __init__(self, fontfile: str, smufl: str = None,
+                 cache: Cache = None, ranges: List[Tuple[int, int]] = None,
+                 blocks: List[str] = None, private: bool = True,
+                 fontNumber: int = None, font: ttLib.TTFont = None) -> None:
         """__init__. Constructor.
 
         Args:
             fontfile (str): The font file.
             smufl (str,optional): sMuFL glyphnames.json file.
+            cache (Cache,optional): Cache of parsed fonts. When the font and
+            glyphnames are unchanged, name and codepoints are retrieved from
+            cache and the font is not parsed at all.
+            ranges (List[Tuple[int,int]],optional): Inclusive codepoint
+            ranges to include, see :func:`~gensty.ranges.parseRanges`.
+            blocks (List[str],optional): Unicode blocks to include.
+            private (bool,optional): Allow private symbols.
+            fontNumber (int,optional): Face index, for font collections.
+            font (TTFont,optional): Already open font face, eg. from a
+            collection sharing its tables between faces. It is not closed.
 
         Returns:
              Constructor.
         """
         self.errors: list = []
+        self.missing: list = []
+        self.duplicates: list = []
         self.fontfile: str = fontfile
+        self.fontNumber: int = fontNumber
         if checkFont(fontfile, SUPPORTED_FONTS) == False:
             self.errors.append("Could not file font file, or not supported")
             pass
         self.__smufl: str = smufl
-        self.name: str = self.__getName()
-        self.codepoints: str = self.Codepoints()
+        self.__font: ttLib.TTFont = font
+        self.__mapping = None
+        self.__shared: bool = font != None
+        self.__cache: Cache = cache
+        self.__private: bool = private
+        self.__filter: RangeIndex = None
+        if ranges != None or blocks != None:
+            self.__filter = RangeIndex(
+                (ranges or []) + blockRanges(blocks or []))
+        if cache != None and self.__fromCache(cache) == True:
+            return
+        try:
+            self.name: str = self.__getName()
+            self.codepoints: GlyphTable = self.Codepoints()
+        finally:
+            self.close()
+        if cache != None and isinstance(self.codepoints, GlyphTable):
+            cache.set(self.__cacheKey, {
+                'name': self.name,
+                'codepoints': list(self.codepoints),
+                'missing': self.missing,
+                'duplicates': self.duplicates,
+            })
+
+    def __fromCache(self, cache: Cache) -> bool:
+        """__fromCache. Retrieves name and codepoints from cache, keyed by
+        font and glyphnames content, filters and Unicode database version.
+
+        Args:
+            cache (Cache): Cache of parsed fonts.
+
+        Returns:
+            True in case of cache hit.
+        """
+        smuflHash = ""
+        if self.__smufl != None and os.path.isfile(self.__smufl):
+            smuflHash = fileHash(self.__smufl)
+        filters = None
+        if self.__filter != None:
+            filters = self.__filter.ranges()
+        # names depend on the Unicode database, eg. after upgrading Python.
+        self.__cacheKey = cacheKey(fileHash(self.fontfile), smuflHash,
+                                   filters, self.__private, self.fontNumber,
+                                   unicodedata.unidata_version)
+        entry = cache.get(self.__cacheKey)
+        if entry == None:
+            return False
+        self.name = entry['name']
+        self.codepoints = GlyphTable(entry['codepoints'])
+        self.missing = [tuple(item) for item in entry['missing']]
+        self.duplicates = [tuple(item) for item in entry['duplicates']]
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __openFont(self) -> ttLib.TTFont:
+        """__openFont. Opens the font file once and shares the handle between
+        name and codepoint parsing. The font is read from a memory mapping,
+        see :func:`~gensty.cache.mapFile`, and loaded lazily, so only the
+        tables actually accessed (`name` and `cmap`) are read and decoded.
+
+        Returns:
+            The font handle.
+        """
+        if self.__font is None:
+            self.__mapping = mapFile(self.fontfile)
+            self.__font = ttLib.TTFont(
+                self.__mapping if self.__mapping != None else self.fontfile,
+                lazy=True, fontNumber=self.fontNumber or 0)
+        return self.__font
+
+    def close(self):
+        """close. Closes the font handle and its mapping, if any is open.
+        Shared handles are released, but left open for their owner."""
+        if self.__font is not None and self.__shared == False:
+            self.__font.close()
+        self.__font = None
+        if self.__mapping != None:
+            self.__mapping.close()
+            self.__mapping = None
 
     def __getName(self) -> str:
         """__getName. Get the name from the font's names table. Customized
@@ -52,56 +167,64 @@ class Info:
             Font name.
         """
         name = ""
-        font = ttLib.TTFont(self.fontfile)
+        font = self.__openFont()
         for record in font['name'].names:
-            if record.nameID == 4 and not name:
-                if b'\000' in record.string:
-                    name = str(record.string, 'utf-16-be').encode('utf-8')
-                else:
-                    name = record.string
-                    if name:
-                        break
-        font.close()
-        name = name.decode('utf-8')
+            if record.nameID == 4:
+                name = record.toUnicode()
+                if name:
+                    break
         return name.replace(" ", "").replace("-", "")
 
     def __glyphnameParse(self) -> List[Tuple[str, str]]:
-        """__glyphnameParse. Parses glyphname file according w3c/smufl
-        reference.
+        """__glyphnameParse. Retrieves the codepoints of glyphname file from
+        the shared index, see :func:`~gensty.smufl.glyphnameIndex`.
 
         Returns:
             A list of  codepoint and their description.
         """
-        result = []
-        with open(self.__smufl) as json_file:
-            gnames = json.load(json_file)
-            for gname in gnames:
-                codepoint = gnames[gname]["codepoint"].replace("U+", "")
-                result.append((int(codepoint, 16), gname))
-        return result
+        return list(glyphnameIndex(self.__smufl, self.__cache))
 
+    @profiled("cmap")
     def __fontCodepoints(self) -> List[Tuple[int, str]]:
         """__fontCodepoints. Creates a list of codepoints and names for every
-        character/symbol in the given font.
+        character/symbol in the given font. The best Unicode cmap is used,
+        merged with any codepoint only found in other Unicode subtables, so
+        every codepoint is listed once.
 
         Returns:
-            A list of Tuples with condpoints and UTF-8 description.
+            A sorted list of Tuples with condpoints and glyph names.
         """
-        font = ttLib.TTFont(self.fontfile)
-        charcodes = []
+        font = self.__openFont()
+        charcodes = dict(font.getBestCmap() or {})
         for x in font["cmap"].tables:
             if not x.isUnicode():
                 continue
-            for y in x.cmap.items():
-                charcodes.append(y)
-        font.close()
-        sorted(charcodes)
-        return charcodes
+            for code, glyph in x.cmap.items():
+                charcodes.setdefault(code, glyph)
+        return sorted(charcodes.items())
+
+    def __filterCodepoints(self, charcodes: list) -> list:
+        """__filterCodepoints. Keeps only the codepoints in the requested
+        ranges and blocks, if any.
+
+        Args:
+            charcodes (list): Codepoints and names/glyphs.
 
-    def __fontCharList(self, charcodes: list, private: bool = False,
+        Returns:
+            Filtered codepoints and names/glyphs.
+        """
+        if self.__filter == None:
+            return charcodes
+        return [item for item in charcodes if item[0] in self.__filter]
+
+    @profiled("names")
+    def __fontCharList(self, charcodes: list, private: bool = True,
                        excluded: list = []) -> List[Tuple[str, str]]:
         """__fontCharList. Accepts list of tuples with charcodes and codepoints
-        and returns names and charcodes.
+        and returns names and charcodes. Every name is used once, codepoints
+        with an already used name are collected in `duplicates`. Names are
+        resolved in bulk from the precomputed table of
+        :func:`~gensty.names.nameTable` when a cache is available.
 
         Args:
             charcodes (list): Codepoints/Symbols created by
@@ -114,13 +237,23 @@ class Info:
         """
         if not isinstance(charcodes, list):
             return False
+        if private == False:
+            charcodes = [item for item in charcodes
+                         if item[0] < 0xE000 or item[0] > 0xF8FF]
+        if self.__cache != None:
+            descriptions = nameTable(self.__cache).lookup(
+                charcode for charcode, _ in charcodes)
+        else:
+            descriptions = [latexName(charcode) for charcode, _ in charcodes]
         result = []
-        for charcode, codepoint in charcodes:
-            description = fixString(Unicode[charcode])
-            if private == True and charcode >= 0xE000 and charcode <= 0xF8FF:
-                continue
+        names = set()
+        for (charcode, _), description in zip(charcodes, descriptions):
             if description in excluded:
                 continue
+            if description in names:
+                self.duplicates.append((charcode, description))
+                continue
+            names.add(description)
             result.append((charcode, description))
         return result
 
@@ -139,25 +272,33 @@ class Info:
             return "fnt"+result
         return result
 
-    def Codepoints(self) -> List[Tuple[int, str]]:
+    @profiled("Codepoints")
+    def Codepoints(self) -> GlyphTable:
         """Codepoints.Retrieves the codepoints and symbols for the desired font,
-        handles differently if its smufl font.
+        handles differently if its smufl font. SMuFL glyphs not mapped by the
+        font are left out and kept in `missing`. Range and block filters are
+        applied before any name is resolved.
 
         Returns:
-            The final list of codepoints/description.
+            The final table of codepoints/description.
         """
         if self.__smufl != None and checkExtension(self.__smufl, "json") == True:
             charcodes = self.__glyphnameParse()
             if len(charcodes) == 0:
                 self.errors.append("Empty glyphnames file.")
                 return False
-            return charcodes
+            charcodes = self.__filterCodepoints(charcodes)
+            fontCodepoints = {code for code, _ in self.__fontCodepoints()}
+            self.missing = [item for item in charcodes
+                            if item[0] not in fontCodepoints]
+            return GlyphTable(item for item in charcodes
+                              if item[0] in fontCodepoints)
         else:
-            charcodes = self.__fontCodepoints()
-            charcodes = self.__fontCharList(charcodes,
+            charcodes = self.__filterCodepoints(self.__fontCodepoints())
+            charcodes = self.__fontCharList(charcodes, self.__private,
                                             excluded=["????", "Space"])
             if isinstance(charcodes, list):
-                return charcodes
+                return GlyphTable(charcodes)
             else:
                 self.errors.append("Error with parsing file.")
                 return False
@@ -169,15 +310,24 @@ class LaTeXstyle(Info):
     - Header. Includes Package name and requirements.
     - DefCommands: The definitions of commands.
     - Commands: LaTeX commands based on provided codepoints.
+    - SplitFiles: Alternatively, a root package along with the commands split
+      in files loaded on demand.
     - File: The full LaTeX Style package including all above.
     """
 
-    def __init__(self, version: str = None, author: str = None, **kwargs) -> None:
+    __slots__ = ("templates", "__version", "__author", "__fontfileBase",
+                 "__fontIndex", "__packageName", "__forcedName", "__backend",
+                 "__year")
+
+    def __init__(self, version: str = None, author: str = None,
+                 templates: str = None, **kwargs) -> None:
         """__init__. Constructor.
 
         Args:
             version (str): LaTeX package version.
             author (str): LaTeX package author.
+            templates (str): Directory of user templates, overriding the
+            bundled ones with the same file name.
         kwargs: dict of arguments for intialization of :func:`~gensty.font.Info`
 
         Returns:
@@ -185,7 +335,14 @@ class LaTeXstyle(Info):
         """
         fontfile = kwargs.get('fontfile', None)
         smufl = kwargs.get('smufl', None)
-        Info.__init__(self, fontfile, smufl)
+        cache = kwargs.get('cache', None)
+        ranges = kwargs.get('ranges', None)
+        blocks = kwargs.get('blocks', None)
+        private = kwargs.get('private', True)
+        fontNumber = kwargs.get('fontNumber', None)
+        font = kwargs.get('font', None)
+        Info.__init__(self, fontfile, smufl, cache, ranges, blocks, private,
+                      fontNumber, font)
         if len(self.errors) > 0:
             print(self.errors)
             pass
@@ -197,9 +354,12 @@ class LaTeXstyle(Info):
             self.__author = __author__
         else:
             self.__author = author
+        self.templates = templates
         self.__fontfileBase = os.path.basename(self.fontfile)
+        self.__fontIndex = self.fontNumber
         self.__packageName = None
         self.__forcedName = None
+        self.__backend = "macros"
         self.__year = datetime.today().strftime('%Y')
 
     def setPackage(self, packageName: str):
@@ -216,16 +376,54 @@ class LaTeXstyle(Info):
         Args:
             commandName (str): Command Name
         """
-        self.forcedCommand = commandName
+        self.__forcedName = commandName
+
+    def setBundle(self, fontfile: str, fontNumber: int = None):
+        """setBundle. Sets the font file bundled in package, eg. a subset,
+        overrides default (the parsed font file).
+
+        Args:
+            fontfile (str): Bundled font file.
+            fontNumber (int): Face index, if the bundled file is a collection.
+        """
+        self.__fontfileBase = os.path.basename(fontfile)
+        self.__fontIndex = fontNumber
+
+    def __fontOptions(self) -> str:
+        """__fontOptions. Extra fontspec options of bundled font, the face
+        index for collections.
+
+        Returns:
+            Options, each preceded by a comma.
+        """
+        if self.__fontIndex == None:
+            return ""
+        return ",FontIndex=%d" % self.__fontIndex
 
-    def __description(self) -> str:
+    def setBackend(self, backend: str):
+        """setBackend. Sets how symbols are stored in LaTeX: `macros`, one
+        control sequence per symbol (default), `expl3`, a single expl3
+        property list, or `lua`, a single Lua table (LuaLaTeX only).
+
+        Args:
+            backend (str): Backend name, see `config.BACKENDS`.
+        """
+        if backend not in BACKENDS:
+            raise Exception("Error! Unknown backend '%s'." % backend)
+        self.__backend = backend
+
+    def __description(self, fonts: str = None) -> str:
         """Creates default description text based on name and version.
 
+        Args:
+            fonts (str, optional): Fonts of package, the font name by default.
+
         Returns:
             Description text for header.
         """
         currentDate = datetime.today().strftime('%Y-%m-%d')
-        return "%s %s LaTeX package for %s" % (currentDate, self.__version, self.name)
+        return "%s %s LaTeX package for %s" % (currentDate, self.__version,
+                                               fonts or self.name)
 
     def __requirements(self, requirements: list = []) -> str:
         """__requirements. Creates LaTeX package requirements. By default
@@ -259,7 +457,8 @@ class LaTeXstyle(Info):
         return (defCmd, self.name)
 
     def __makeTemplate(self, template: str, tokens: dict) -> str:
-        """__makeTemplate. Parses and replace tokens in template string.
+        """__makeTemplate. Replaces tokens in template, compiled once per
+        process by :func:`~gensty.template.loadTemplate`.
 
         Args:
             template (str): Template file
@@ -268,15 +467,16 @@ class LaTeXstyle(Info):
         Returns:
             String based on provided template.
         """
-        genstyPath = os.path.abspath(os.path.dirname(__file__))
-        with open(genstyPath+"/"+template) as templateFile:
-            template = templateFile.read()
-            output = ReplaceToken(tokens, template)
-        return output
+        return loadTemplate(template, self.templates).render(tokens)
 
-    def Header(self) -> str:
+    @profiled("Header")
+    def Header(self, fonts: str = None) -> str:
         """Header. Fills header style partial template
 
+        Args:
+            fonts (str, optional): Fonts named in package description, the
+            font name by default.
+
         Returns:
             LaTeX Style package header partial.
         """
@@ -285,13 +485,14 @@ class LaTeXstyle(Info):
 
         tokens = {
             'packageName': self.__packageName,
-            'description': self.__description(),
+            'description': self.__description(fonts),
             'year': self.__year,
             'author': self.__author,
             'requirements': self.__requirements(LATEX_REQUIREMENTS)
         }
         return self.__makeTemplate(HEADER_TEMPLATE, tokens)
 
+    @profiled("DefCommands")
     def DefCommands(self) -> str:
         """DefCommands. Fills Commands definition style partial.
 
@@ -302,12 +503,160 @@ class LaTeXstyle(Info):
         tokens = {
             'fontfile': self.__fontfileBase,
             'fontspath': FONTDIR,
+            'fontoptions': self.__fontOptions(),
             'fontfamily': self.Identifier(),
             'fntidentifier': self.Identifier(),
             'defcommand': defcommand,
             'command': command,
         }
-        return self.__makeTemplate(COMMANDS_TEMPLATE, tokens)
+        return self.__makeTemplate(BACKENDS[self.__backend], tokens)
+
+    def FontFamily(self, family: str = None) -> str:
+        """FontFamily. Fills the font family declaration partial, used by
+        packages merging several fonts, see :class:`~gensty.merge.MergedStyle`.
+
+        Args:
+            family (str, optional): Family name, the font identifier by
+            default.
+
+        Returns:
+            LaTeX font family declaration.
+        """
+        tokens = {
+            'fontfile': self.__fontfileBase,
+            'fontspath': FONTDIR,
+            'fontoptions': self.__fontOptions(),
+            'fontfamily': family or self.Identifier(),
+        }
+        return self.__makeTemplate(FAMILY_TEMPLATE, tokens)
+
+    def Chunks(self) -> Dict[str, List[Tuple[int, str]]]:
+        """Chunks. Groups codepoints by Unicode block, in a single pass over
+        the codepoints. Private Use Area, where SMuFL glyphs live, is split
+        in pages of 256 codepoints.
+
+        Returns:
+            Codepoints/description of every chunk, by chunk identifier.
+        """
+        chunks = {}
+        if not isinstance(self.codepoints, GlyphTable):
+            return chunks
+        for item in self.codepoints:
+            block = blockName(item[0])
+            if block == "Private Use Area":
+                block += " %04x" % (item[0] & ~0xFF)
+            chunk = "".join(c for c in block.lower() if c.isalnum())
+            chunks.setdefault(chunk, []).append(item)
+        return chunks
+
+    def SplitFiles(self) -> List[Tuple[str, str]]:
+        """SplitFiles. Creates a split LaTeX Style package: a small root
+        package and one definitions file per chunk (see
+        :func:`~gensty.font.LaTeXstyle.Chunks`), loaded through package
+        options (or option `all`) or on first use of one of its symbols.
+
+        Returns:
+            File names and contents, root package first.
+        """
+        if self.__backend != "macros":
+            raise Exception("Error! Split packages need the macros backend.")
+        chunks = self.Chunks()
+        header = self.Header()
+        defcommand, command = self.__defcommands()
+        identifier = self.Identifier()
+        options = "".join(
+            "\\DeclareOption{%s}{\\%s@load{%s}}\n" % (chunk, identifier, chunk)
+            for chunk in chunks)
+        tokens = {
+            'fontfile': self.__fontfileBase,
+            'fontspath': FONTDIR,
+            'fontoptions': self.__fontOptions(),
+            'fontfamily': identifier,
+            'fntidentifier': identifier,
+            'defcommand': defcommand,
+            'command': command,
+            'packageName': self.__packageName,
+            'chunks': ",".join(chunks),
+            'options': options,
+        }
+        files = [(self.__packageName + ".sty",
+                  header + self.__makeTemplate(SPLIT_TEMPLATE, tokens))]
+        for chunk, codepoints in chunks.items():
+            files.append((self.__packageName + "-" + chunk + ".def", "".join(
+                self.__iterCommands(codepoints, len(codepoints)))))
+        return files
+
+    def __iterCommands(self, codepoints: list,
+                       chunkSize: int) -> Iterator[str]:
+        """__iterCommands. Generates LaTeX commands for the given codepoints,
+        in chunks of `chunkSize` commands.
+
+        Args:
+            codepoints (list): Codepoints/description.
+            chunkSize (int): Number of commands per chunk.
+
+        Yields:
+            Chunks of commands.
+        """
+        defcommand, _ = self.__defcommands()
+        chunk = ["\n"]
+        for codepoint, desc in codepoints:
+            chunk.append("\\" + defcommand +
+                         "{"+desc+"}{\\symbol{"+str(codepoint)+"}}\n")
+            if len(chunk) >= chunkSize:
+                yield "".join(chunk)
+                chunk = []
+        if len(chunk) > 0:
+            yield "".join(chunk)
+
+    @profiled("Commands")
+    def iterCommands(self, chunkSize: int = 1024) -> Iterator[str]:
+        """iterCommands. Generates LaTeX commands for each char code, in
+        chunks of `chunkSize` commands, so the whole block never needs to be
+        held in memory.
+
+        Args:
+            chunkSize (int): Number of commands per chunk.
+
+        Yields:
+            Chunks of commands based on symbols from font.
+        """
+        if not isinstance(self.codepoints, GlyphTable) or len(self.codepoints) == 0:
+            return
+        if self.__backend == "expl3":
+            yield from self.__iterTable(
+                "\n\\ExplSyntaxOn\n\\prop_gset_from_keyval:cn { g_%s_symbols_prop }\n  {\n"
+                % self.Identifier(), "    %s = %d ,\n", "  }\n\\ExplSyntaxOff\n",
+                chunkSize)
+        elif self.__backend == "lua":
+            yield from self.__iterTable(
+                "\n\\directlua{gensty[\"%s\"] = {\n" % self.Identifier(),
+                "  [\"%s\"] = %d,\n", "}}\n", chunkSize)
+        else:
+            yield from self.__iterCommands(self.codepoints, chunkSize)
+
+    def __iterTable(self, start: str, item: str, end: str,
+                    chunkSize: int) -> Iterator[str]:
+        """__iterTable. Generates the symbols as a single data structure
+        (expl3 property list or Lua table) in chunks of `chunkSize` items.
+
+        Args:
+            start (str): Opening of data structure.
+            item (str): Format of every name and codepoint.
+            end (str): Closing of data structure.
+            chunkSize (int): Number of items per chunk.
+
+        Yields:
+            Chunks of data structure.
+        """
+        chunk = [start]
+        for codepoint, desc in self.codepoints:
+            chunk.append(item % (desc, codepoint))
+            if len(chunk) >= chunkSize:
+                yield "".join(chunk)
+                chunk = []
+        chunk.append(end)
+        yield "".join(chunk)
 
     def Commands(self) -> str:
         """Commands. Generates LaTeX commands for each char code.
@@ -315,24 +664,26 @@ class LaTeXstyle(Info):
         Returns:
             Commands based on symbols from font.
         """
-        if not isinstance(self.codepoints, list):
-            return False
-        commands = "\n"
-        defcommand, _ = self.__defcommands()
-        for codepoint, desc in self.codepoints:
-            commands += "\\" + defcommand + \
-                "{"+desc+"}{\\symbol{"+str(codepoint)+"}}\n"
-        if commands == "\n":
+        commands = "".join(self.iterCommands())
+        if commands == "":
             return False
         return commands
 
+    def iterFile(self) -> Iterator[str]:
+        """iterFile. Generates a full LaTeX Style package in chunks, see
+        :func:`~gensty.font.LaTeXstyle.iterCommands`.
+
+        Yields:
+            LaTeX Style package chunks.
+        """
+        yield self.Header()
+        yield self.DefCommands()
+        yield from self.iterCommands()
+
     def File(self) -> str:
         """File. Creates a full LaTeX Style package.
 
         Returns:
             LaTeX Style package.
         """
-        header = self.Header()
-        definitions = self.DefCommands()
-        commands = self.Commands()
-        return header + definitions + commands
+        return "".join(self.iterFile())
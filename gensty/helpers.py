@@ -2,9 +2,13 @@
 """Gensty helpers. A collection of functions to manipulate strings, search for
 files and create folders."""
 import os
-import sys
 import shutil
-from typing import Tuple, List, Union
+import hashlib
+import fnmatch
+import threading
+from gensty.cache import fileHash, isCached
+from gensty.config import FONT_LINKS
+from typing import List, Union, Iterable, Iterator
 
 
 def isFontPath(path):
@@ -86,16 +90,172 @@ def checkExtension(path: str, ext: str) -> bool:
     return True
 
 
-def writePackage(filename: str, content: str):
-    """writePackage. Writes Style file.
+def __tempPath(path: str) -> str:
+    """__tempPath. Temporary file next to `path`, unique per process and
+    thread, renamed over `path` once complete.
+
+    Args:
+        path (str): Destination path.
+
+    Returns:
+        Temporary file path.
+    """
+    return "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+
+
+def writePackage(filename: str, content: Union[str, Iterable[str]],
+                 extension: str = "sty") -> str:
+    """writePackage. Writes Style file, leaving it untouched when the content
+    is identical. Content can be given as an iterable of chunks, which are
+    written as soon as produced.
 
     Args:
         filename (str): Filename for newely created file.
-        content (str): Content of the LaTeX package.
+        content (str, Iterable[str]): Content of the LaTeX package.
+        extension (str): File extension.
+
+    Returns:
+        The SHA-256 hash of the content.
+    """
+    if isinstance(content, str):
+        content = [content]
+    path = filename + "." + extension
+    tmp = __tempPath(path)
+    digest = hashlib.sha256()
+    try:
+        with open(tmp, "wb") as sty:
+            for chunk in content:
+                chunk = chunk.encode("utf-8")
+                digest.update(chunk)
+                sty.write(chunk)
+    except BaseException:
+        # the temporary file may not exist, if it could not be created.
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+    digest = digest.hexdigest()
+    if os.path.isfile(path) and fileHash(path) == digest:
+        os.remove(tmp)
+    else:
+        os.replace(tmp, path)
+    return digest
+
+
+def __reflink(source: str, target: str):
+    """__reflink. Clones a file sharing its blocks (copy-on-write), through the
+    FICLONE ioctl, supported on Linux by Btrfs, XFS and others.
+
+    Args:
+        source (str): Source file.
+        target (str): New file.
+    """
+    import fcntl
+    FICLONE = 0x40049409
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, target)
+
+
+def __isPlaced(fontfile: str, target: str, digest: str, link: str) -> bool:
+    """__isPlaced. Whether `target` already is the font, placed by `link`.
+
+    Args:
+        fontfile (str): Font file.
+        target (str): Placed font file.
+        digest (str): SHA-256 hash of font file.
+        link (str): Placement method.
+
+    Returns:
+        True if the target can be left untouched.
+    """
+    if link == "symlink":
+        return os.path.islink(target) and \
+            os.readlink(target) == os.path.abspath(fontfile)
+    if not os.path.isfile(target) or os.path.islink(target):
+        return False
+    if link == "hardlink":
+        return os.path.samefile(fontfile, target)
+    return fileHash(target) == digest
+
+
+def bundleNames(fontfiles: List[str]) -> List[str]:
+    """bundleNames. File names of fonts bundled in one package folder. A font
+    whose file name is already taken by a different font file gets a
+    numbered suffix, eg. `Foo.ttf` and `Foo-2.ttf`.
+
+    Args:
+        fontfiles (List[str]): Font files, a file may be given more than once
+        (eg. faces of a collection).
+
+    Returns:
+        The file name of every font file, in the same order.
+    """
+    names = {}
+    taken = set()
+    for fontfile in fontfiles:
+        if fontfile in names:
+            continue
+        name = os.path.basename(fontfile)
+        stem, extension = os.path.splitext(name)
+        count = 1
+        while name in taken:
+            count += 1
+            name = "%s-%d%s" % (stem, count, extension)
+        names[fontfile] = name
+        taken.add(name)
+    return [names[fontfile] for fontfile in fontfiles]
+
+
+def copyFont(fontfile: str, path: str, link: str = "copy",
+             filename: str = None) -> str:
+    """copyFont. Places a font file in the given directory, leaving the
+    destination untouched when identical. Placing is atomic, a temporary file
+    is renamed over the destination.
+
+    Args:
+        fontfile (str): Font file.
+        path (str): Destination directory.
+        link (str): How the font is placed, one of `copy`, `hardlink`,
+        `symlink` (to the absolute font path) or `reflink` (copy-on-write
+        clone). When the file system does not support it, the font is copied.
+        Fonts generated in cache (subsets, decompressed web fonts) are copied
+        instead of symlinked, since the cache may remove them.
+        filename (str, optional): File name in destination, the font file
+        name by default.
+
+    Returns:
+        The SHA-256 hash of the font file.
     """
-    sty = open(filename+".sty", "w")
-    sty.write(content)
-    sty.close()
+    if link not in FONT_LINKS:
+        raise Exception("Error! Unknown font link %s, choose one of: %s" % (
+            link, ", ".join(FONT_LINKS)))
+    if link == "symlink" and isCached(fontfile):
+        link = "copy"
+    digest = fileHash(fontfile)
+    target = os.path.join(path, filename or os.path.basename(fontfile))
+    if __isPlaced(fontfile, target, digest, link):
+        return digest
+    tmp = __tempPath(target)
+    try:
+        if link == "hardlink":
+            os.link(fontfile, tmp)
+        elif link == "symlink":
+            os.symlink(os.path.abspath(fontfile), tmp)
+        elif link == "reflink":
+            __reflink(fontfile, tmp)
+        else:
+            shutil.copy2(fontfile, tmp)
+    except (OSError, ImportError):
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        try:
+            shutil.copy2(fontfile, tmp)
+        except BaseException:
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            raise
+    os.replace(tmp, target)
+    return digest
 
 
 def ReplaceToken(dict_replace: dict, target: str) -> str:
@@ -115,6 +275,92 @@ def ReplaceToken(dict_replace: dict, target: str) -> str:
     return target
 
 
+def __matches(relpath: str, patterns: List[str]) -> bool:
+    """__matches. Checks a path against glob patterns. Patterns including a
+    `/` match the path relative to the discovery root, the rest match the
+    file or folder name.
+
+    Args:
+        relpath (str): Path relative to discovery root, `/` separated.
+        patterns (List[str]): Glob patterns.
+
+    Returns:
+        True in case any pattern matches.
+    """
+    name = relpath.rsplit("/", 1)[-1]
+    for pattern in patterns:
+        if fnmatch.fnmatchcase(relpath if "/" in pattern else name, pattern):
+            return True
+    return False
+
+
+def discoverFonts(path: str, supported_fonts: list = [],
+                  recursive: bool = False, include: List[str] = None,
+                  exclude: List[str] = None, followSymlinks: bool = False,
+                  minSize: int = None, maxSize: int = None) -> Iterator[str]:
+    """discoverFonts. Finds fonts in a folder, in a single `os.scandir` pass
+    per folder. Paths are yielded as soon as found, folder by folder in name
+    order, so fonts can be processed while discovery goes on.
+
+    Args:
+        path (str): Directory includes fonts.
+        supported_fonts (list): A list of supported fonts (extensions).
+        recursive (bool): Descends into subfolders.
+        include (List[str]): Glob patterns, only matching fonts are yielded.
+        exclude (List[str]): Glob patterns of fonts and subfolders skipped.
+        followSymlinks (bool): Descends into symbolically linked folders,
+        visiting each folder once. Linked font files are always yielded.
+        minSize (int): Skips fonts smaller than `minSize` bytes.
+        maxSize (int): Skips fonts larger than `maxSize` bytes.
+
+    Yields:
+        File paths of supported fonts.
+    """
+    extensions = tuple("." + ext for ext in supported_fonts)
+    folders = [(path, "")]
+    visited = set()
+    while len(folders) > 0:
+        folder, relfolder = folders.pop()
+        try:
+            stat = os.stat(folder)
+        except OSError:
+            continue
+        if (stat.st_dev, stat.st_ino) in visited:
+            continue
+        visited.add((stat.st_dev, stat.st_ino))
+        try:
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subfolders = []
+        for entry in entries:
+            relpath = relfolder + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=followSymlinks):
+                    if recursive == True and \
+                            not __matches(relpath, exclude or []):
+                        subfolders.append((entry.path, relpath + "/"))
+                    continue
+                if not entry.name.endswith(extensions) or \
+                        not entry.is_file():
+                    continue
+                if include != None and not __matches(relpath, include):
+                    continue
+                if exclude != None and __matches(relpath, exclude):
+                    continue
+                if minSize != None or maxSize != None:
+                    size = entry.stat().st_size
+                    if (minSize != None and size < minSize) or \
+                            (maxSize != None and size > maxSize):
+                        continue
+            except OSError:
+                continue
+            yield entry.path
+        # depth first, subfolders in name order.
+        folders.extend(reversed(subfolders))
+
+
 def getFontsByType(path: str, supported_fonts: list = []) -> List[str]:
     """getFontsByType. Gets supported fonts by file extesion in a given folder.
 
@@ -123,17 +369,10 @@ def getFontsByType(path: str, supported_fonts: list = []) -> List[str]:
         supported_fonts (list): A list of supported fonts (extensions)
 
     Returns:
-        File paths of supported fonts.
+        File paths of supported fonts, see
+        :func:`~gensty.helpers.discoverFonts`.
     """
-    files = []
-    for ext in supported_fonts:
-        fonts = findByExt(path, ext)
-        if not isinstance(fonts, list):
-            continue
-        for font in fonts:
-            files.append(font)
-
-    return files
+    return list(discoverFonts(path, supported_fonts))
 
 
 def fixString(s: str) -> str:
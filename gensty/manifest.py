@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Gensty manifest. Records the inputs and outputs of every generated package,
+so incremental runs regenerate only the packages whose inputs changed."""
+import os
+import json
+from gensty.cache import cacheKey, fileHash
+from gensty.template import templatePath
+from gensty.config import MANIFEST_FILE, HEADER_TEMPLATE, SPLIT_TEMPLATE
+from gensty.config import BACKENDS, FAMILY_TEMPLATE, MERGED_BACKENDS
+from typing import List
+
+
+def packageKey(fontfiles: List[str], smufl: str = None, templates: str = None,
+               **options) -> str:
+    """packageKey. Creates the key identifying all inputs of a package: font
+    files, glyphnames, templates and options.
+
+    Args:
+        fontfiles (List[str]): Font files included in package.
+        smufl (str, optional): SMuFL glyphnames.json file.
+        templates (str, optional): Directory of user templates.
+        options: Any generation option (version, author, package name etc.)
+
+    Returns:
+        Hex digest of package inputs.
+    """
+    parts = [fileHash(ffile) for ffile in fontfiles]
+    if smufl != None and os.path.isfile(smufl):
+        parts.append(fileHash(smufl))
+    templateFiles = [HEADER_TEMPLATE, SPLIT_TEMPLATE, FAMILY_TEMPLATE] + \
+        sorted(BACKENDS.values()) + sorted(MERGED_BACKENDS.values())
+    for template in templateFiles:
+        parts.append(fileHash(templatePath(template, templates)))
+    parts.append(json.dumps(options, sort_keys=True))
+    return cacheKey(*parts)
+
+
+class Manifest:
+    """Manifest. The manifest of a package folder, holding the package key and
+    the hash of every output file (relative to the package folder).
+
+    Attributes:
+        path (str): The manifest file.
+        key (str): Recorded package key.
+        outputs (dict): Output files and their hashes.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """__init__. Constructor, loads the manifest if exists.
+
+        Args:
+            directory (str): Package folder.
+        """
+        self.directory: str = directory
+        self.path: str = os.path.join(directory, MANIFEST_FILE)
+        self.key: str = None
+        self.outputs: dict = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.key = manifest["key"]
+            self.outputs = manifest["outputs"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def isFresh(self, key: str) -> bool:
+        """isFresh. Checks the package was generated from the same inputs and
+        its outputs are untouched.
+
+        Args:
+            key (str): Current package key.
+
+        Returns:
+            True in case the package is up to date.
+        """
+        if self.key != key or len(self.outputs) == 0:
+            return False
+        for output, digest in self.outputs.items():
+            output = os.path.join(self.directory, output)
+            if not os.path.isfile(output) or fileHash(output) != digest:
+                return False
+        return True
+
+    def record(self, key: str, outputs: dict):
+        """record. Saves the manifest and removes the outputs of previous
+        run which are no longer generated.
+
+        Args:
+            key (str): Package key.
+            outputs (dict): Output files and their hashes.
+        """
+        for output in self.outputs:
+            if output not in outputs:
+                stale = os.path.join(self.directory, output)
+                if os.path.isfile(stale):
+                    os.remove(stale)
+        self.key = key
+        self.outputs = outputs
+        tmp = "%s.%d.tmp" % (self.path, os.getpid())
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "outputs": outputs}, f, indent=1,
+                      sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""Gensty merge. One LaTeX Style package for several fonts, built on a
+cross-font symbol index: every symbol name is resolved once, to the font
+ranked first by the priority rule, and all symbols are looked up through a
+single command."""
+from gensty.font import LaTeXstyle
+from gensty.names import GlyphTable
+from gensty.template import loadTemplate
+from gensty.timings import profiled
+from gensty.config import MERGED_BACKENDS, PRIORITIES
+from typing import Dict, Iterator, List, Tuple
+
+
+def mergedCommand(packageName: str, forcedCommand: str = None) -> str:
+    """mergedCommand. The command of a merged package, the forced command or
+    the letters of package name, since control words are made of letters
+    only.
+
+    Args:
+        packageName (str): Package name.
+        forcedCommand (str, optional): Forced command name.
+
+    Returns:
+        Command name, empty if the package name has no letters.
+    """
+    return forcedCommand or "".join(c for c in packageName if c.isalpha())
+
+
+class SymbolIndex:
+    """SymbolIndex. Symbol names of several fonts, each one resolved to a
+    single font. Fonts are ranked by the priority rule:
+
+    - first: earlier fonts win (default).
+    - last: later fonts win.
+    - coverage: fonts with more symbols win, ties by font order.
+
+    Attributes:
+        fonts (List[LaTeXstyle]): Indexed fonts, in the given order.
+        symbols (Dict[str,Tuple[int,int]]): Font position and codepoint, by
+        symbol name.
+        overridden (List[Tuple[int,int,str]]): Font position, codepoint and
+        name of every symbol left out, since a higher ranked font defines the
+        same name.
+    """
+
+    def __init__(self, fonts: List[LaTeXstyle], priority: str = "first") -> None:
+        """__init__. Constructor, indexes the symbols of fonts.
+
+        Args:
+            fonts (List[LaTeXstyle]): Prepared fonts.
+            priority (str): Priority rule, see `config.PRIORITIES`.
+        """
+        if priority not in PRIORITIES:
+            raise Exception("Error! Unknown priority '%s', choose one of: %s" % (
+                priority, ", ".join(PRIORITIES)))
+        self.fonts: List[LaTeXstyle] = fonts
+        self.symbols: Dict[str, Tuple[int, int]] = {}
+        self.overridden: List[Tuple[int, int, str]] = []
+        for idx in self.__ranking(priority):
+            for codepoint, name in self.__codepoints(idx):
+                if name in self.symbols:
+                    self.overridden.append((idx, codepoint, name))
+                    continue
+                self.symbols[name] = (idx, codepoint)
+
+    def __codepoints(self, idx: int) -> List[Tuple[int, str]]:
+        """__codepoints. Codepoints of a font, empty if it has none.
+
+        Args:
+            idx (int): Font position.
+
+        Returns:
+            Codepoints and names.
+        """
+        codepoints = self.fonts[idx].codepoints
+        return codepoints if isinstance(codepoints, GlyphTable) else []
+
+    def __ranking(self, priority: str) -> List[int]:
+        """__ranking. Font positions, highest priority first.
+
+        Args:
+            priority (str): Priority rule.
+
+        Returns:
+            Ranked font positions.
+        """
+        ranking = list(range(len(self.fonts)))
+        if priority == "last":
+            ranking.reverse()
+        elif priority == "coverage":
+            ranking.sort(key=lambda idx: -len(self.__codepoints(idx)))
+        return ranking
+
+    def codepoints(self, idx: int) -> List[Tuple[int, str]]:
+        """codepoints. Codepoints a font defines in the merged package.
+
+        Args:
+            idx (int): Font position.
+
+        Returns:
+            Codepoints and names, in font order.
+        """
+        return [(codepoint, name) for codepoint, name in self.__codepoints(idx)
+                if self.symbols.get(name) == (idx, codepoint)]
+
+
+class MergedStyle:
+    """MergedStyle. A LaTeX Style package merging several fonts:
+
+    - Header. Package name and requirements, once.
+    - FontFamilies: One font family per font defining any symbol.
+    - DefCommands: The definition of the single command of package, named
+      after the forced command or the package.
+    - Commands: Every symbol exactly once, see
+      :class:`~gensty.merge.SymbolIndex`.
+
+    Attributes:
+        index (SymbolIndex): Cross-font symbol index.
+        packageName (str): Package name.
+        command (str): LaTeX command looking up symbols.
+    """
+
+    def __init__(self, fonts: List[LaTeXstyle], packageName: str,
+                 forcedCommand: str = None, priority: str = "first",
+                 backend: str = "macros") -> None:
+        """__init__. Constructor.
+
+        Args:
+            fonts (List[LaTeXstyle]): Prepared fonts.
+            packageName (str): Package name.
+            forcedCommand (str, optional): Command name, the letters of
+            package name by default.
+            priority (str): Priority rule for symbols defined by several
+            fonts, see :class:`~gensty.merge.SymbolIndex`.
+            backend (str): How symbols are stored in LaTeX, see
+            :func:`~gensty.font.LaTeXstyle.setBackend`.
+        """
+        if backend not in MERGED_BACKENDS:
+            raise Exception("Error! Unknown backend '%s'." % backend)
+        command = mergedCommand(packageName, forcedCommand)
+        if command == "":
+            raise Exception("Error! Package name '%s' has no letters for a "
+                            "command name, please provide one." % packageName)
+        self.index: SymbolIndex = SymbolIndex(fonts, priority)
+        self.packageName: str = packageName
+        self.command: str = command
+        self.__backend = backend
+        self.__identifier = "pkg" + self.command.lower()
+        # one family per font file and face, named after the font, made
+        # unique when different fonts share a name.
+        self.__families: Dict[Tuple[str, int], str] = {}
+        for pkg in fonts:
+            pkg.setPackage(packageName)
+            key = (pkg.fontfile, pkg.fontNumber)
+            if key not in self.__families:
+                self.__families[key] = self.__uniqueFamily(pkg.Identifier())
+
+    def __uniqueFamily(self, family: str) -> str:
+        """__uniqueFamily. A family name not used by any other font, the
+        given one or followed by a letter suffix (control words are made of
+        letters only).
+
+        Args:
+            family (str): Family name of font.
+
+        Returns:
+            Unique family name.
+        """
+        taken = set(self.__families.values())
+        name = family
+        count = 0
+        while name in taken:
+            count += 1
+            suffix = ""
+            number = count
+            while number > 0:
+                number, letter = divmod(number - 1, 26)
+                suffix = chr(ord("a") + letter) + suffix
+            name = family + suffix
+        return name
+
+    def __family(self, pkg: LaTeXstyle) -> str:
+        """__family. Family name of a font in package.
+
+        Args:
+            pkg (LaTeXstyle): Indexed font.
+
+        Returns:
+            Family name.
+        """
+        return self.__families[(pkg.fontfile, pkg.fontNumber)]
+
+    def bundledFonts(self) -> List[Tuple[LaTeXstyle, List[int]]]:
+        """bundledFonts. Fonts defining at least one symbol, in font order,
+        along with the codepoints set in their family, eg. to subset them.
+
+        Returns:
+            Fonts bundled in package and their codepoints.
+        """
+        codepoints = {}
+        for idx, pkg in enumerate(self.index.fonts):
+            codepoints.setdefault(self.__family(pkg), []).extend(
+                codepoint for codepoint, _ in self.index.codepoints(idx))
+        return [(pkg, sorted(set(codepoints[self.__family(pkg)])))
+                for pkg in self.__bundled()]
+
+    def __bundled(self) -> List[LaTeXstyle]:
+        """__bundled. Fonts defining at least one symbol, once per font
+        family; the same font file and face, eg. given twice, shares a
+        family.
+
+        Returns:
+            One font per family.
+        """
+        used = {idx for idx, _ in self.index.symbols.values()}
+        families = {}
+        for idx, pkg in enumerate(self.index.fonts):
+            if idx in used:
+                families.setdefault(self.__family(pkg), pkg)
+        return list(families.values())
+
+    def Header(self) -> str:
+        """Header. Fills header style partial template, describing the
+        package as one for all bundled fonts.
+
+        Returns:
+            LaTeX Style package header partial.
+        """
+        names = dict.fromkeys(pkg.name for pkg in self.__bundled())
+        return self.index.fonts[0].Header(", ".join(names))
+
+    def FontFamilies(self) -> str:
+        """FontFamilies. Declares the font family of every bundled font.
+
+        Returns:
+            LaTeX font family declarations.
+        """
+        return "".join(pkg.FontFamily(self.__family(pkg))
+                       for pkg in self.__bundled())
+
+    def DefCommands(self) -> str:
+        """DefCommands. Fills Commands definition style partial.
+
+        Returns:
+            LaTeX Package commands definition.
+        """
+        tokens = {
+            'fntidentifier': self.__identifier,
+            'defcommand': "Define" + self.command,
+            'command': self.command,
+        }
+        return loadTemplate(MERGED_BACKENDS[self.__backend],
+                            self.index.fonts[0].templates).render(tokens)
+
+    @profiled("Commands", lambda self, *args, **kwargs: self.packageName)
+    def iterCommands(self, chunkSize: int = 1024) -> Iterator[str]:
+        """iterCommands. Generates every symbol of index once, grouped by
+        font, in chunks of `chunkSize` symbols.
+
+        Args:
+            chunkSize (int): Number of symbols per chunk.
+
+        Yields:
+            Chunks of commands.
+        """
+        if self.__backend == "expl3":
+            start = "\n\\ExplSyntaxOn\n\\prop_gset_from_keyval:cn { g_%s_symbols_prop }\n  {\n" \
+                % self.__identifier
+            item = "    %s = { \\%s \\symbol {%d} } ,\n"
+            end = "  }\n\\ExplSyntaxOff\n"
+        elif self.__backend == "lua":
+            start = "\n\\directlua{gensty[\"%s\"] = {\n" % self.__identifier
+            item = "  [\"%s\"] = {\"%s\", %d},\n"
+            end = "}}\n"
+        else:
+            start = "\n"
+            item = "\\Define" + self.command + "{%s}{\\%s\\symbol{%d}}\n"
+            end = ""
+        chunk = [start]
+        for idx, pkg in enumerate(self.index.fonts):
+            family = self.__family(pkg)
+            for codepoint, name in self.index.codepoints(idx):
+                chunk.append(item % (name, family, codepoint))
+                if len(chunk) >= chunkSize:
+                    yield "".join(chunk)
+                    chunk = []
+        chunk.append(end)
+        yield "".join(chunk)
+
+    def Commands(self) -> str:
+        """Commands. Generates every symbol of index once.
+
+        Returns:
+            Commands based on symbols from fonts.
+        """
+        return "".join(self.iterCommands())
+
+    def iterFile(self) -> Iterator[str]:
+        """iterFile. Generates the merged LaTeX Style package in chunks.
+
+        Yields:
+            LaTeX Style package chunks.
+        """
+        yield self.Header()
+        yield self.FontFamilies()
+        yield self.DefCommands()
+        yield from self.iterCommands()
+
+    def File(self) -> str:
+        """File. Creates the merged LaTeX Style package.
+
+        Returns:
+            LaTeX Style package.
+        """
+        return "".join(self.iterFile())
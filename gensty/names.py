@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Gensty names. A precomputed, array backed table of Unicode character names,
+already fixed for LaTeX, used to name every codepoint of a font at once, and
+the compact table of codepoints and names kept for every font."""
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from collections.abc import Sequence
+from gensty.cache import Cache, cacheKey
+from gensty.helpers import fixString
+from typing import Iterable, Iterator, List, Tuple, Union
+try:
+    # same Unicode database as fontTools.unicode, see
+    # https://github.com/mikekap/unicodedata2
+    import unicodedata2 as unicodedata
+except ImportError:
+    import unicodedata
+
+UNKNOWN = "????"
+
+# Name table of this process, once built or loaded.
+_table = None
+
+
+def latexName(codepoint: int) -> str:
+    """latexName. Retrieves the Unicode name of a codepoint, fixed for LaTeX,
+    see :func:`~gensty.helpers.fixString`.
+
+    Args:
+        codepoint (int): Unicode codepoint.
+
+    Returns:
+        Name of codepoint or `????` if unnamed.
+    """
+    return fixString(unicodedata.name(chr(codepoint), UNKNOWN))
+
+
+class NameTable:
+    """NameTable. Sorted codepoints (`array('I')`) along with the offsets of
+    their names in a single ASCII buffer.
+
+    Attributes:
+        codepoints (array): Sorted named codepoints.
+        offsets (array): Start of every name in `names`, plus the end.
+        names (bytes): All names, concatenated.
+    """
+
+    def __init__(self, codepoints: array, offsets: array, names: bytes) -> None:
+        """__init__. Constructor.
+
+        Args:
+            codepoints (array): Sorted named codepoints.
+            offsets (array): Start of every name in `names`, plus the end.
+            names (bytes): All names, concatenated.
+        """
+        self.codepoints: array = codepoints
+        self.offsets: array = offsets
+        self.names: bytes = names
+
+    @classmethod
+    def build(cls) -> "NameTable":
+        """build. Builds the table from the Unicode database.
+
+        Returns:
+            Name table of every named codepoint.
+        """
+        codepoints = array("I")
+        offsets = array("I", [0])
+        names = []
+        size = 0
+        for codepoint in range(sys.maxunicode + 1):
+            name = unicodedata.name(chr(codepoint), None)
+            if name == None:
+                continue
+            name = fixString(name).encode("ascii")
+            size += len(name)
+            codepoints.append(codepoint)
+            offsets.append(size)
+            names.append(name)
+        return cls(codepoints, offsets, b"".join(names))
+
+    def dumps(self) -> bytes:
+        """dumps. Serializes the table.
+
+        Returns:
+            Table in binary form.
+        """
+        header = array("I", [len(self.codepoints)])
+        return (header.tobytes() + self.codepoints.tobytes() +
+                self.offsets.tobytes() + self.names)
+
+    @classmethod
+    def loads(cls, data: bytes) -> "NameTable":
+        """loads. Loads a table serialized by
+        :func:`~gensty.names.NameTable.dumps`.
+
+        Args:
+            data (bytes): Table in binary form.
+
+        Returns:
+            Name table.
+        """
+        view = memoryview(data)
+        header = array("I")
+        header.frombytes(view[:header.itemsize])
+        start = header.itemsize
+        end = start + header[0] * header.itemsize
+        codepoints = array("I")
+        codepoints.frombytes(view[start:end])
+        start, end = end, end + (header[0] + 1) * header.itemsize
+        offsets = array("I")
+        offsets.frombytes(view[start:end])
+        return cls(codepoints, offsets, bytes(view[end:]))
+
+    def lookup(self, codepoints: Iterable[int]) -> List[str]:
+        """lookup. Retrieves the names of many codepoints at once.
+
+        Args:
+            codepoints (Iterable[int]): Codepoints to name.
+
+        Returns:
+            Names, `????` for unnamed codepoints.
+        """
+        table = self.codepoints
+        offsets = self.offsets
+        names = self.names
+        size = len(table)
+        result = []
+        for codepoint in codepoints:
+            idx = bisect_left(table, codepoint)
+            if idx < size and table[idx] == codepoint:
+                result.append(
+                    names[offsets[idx]:offsets[idx + 1]].decode("ascii"))
+            else:
+                result.append(UNKNOWN)
+        return result
+
+
+class GlyphTable(Sequence):
+    """GlyphTable. Codepoints and names of a font, in a compact form: the
+    codepoints in an `array('I')` and the names concatenated in a single
+    string, indexed by offset. Behaves as a read only sequence of
+    `(codepoint, name)` tuples, created on access.
+
+    Attributes:
+        codepoints (array): Codepoints, in table order.
+        offsets (array): Start of every name in `names`, plus the end.
+        names (str): All names, concatenated.
+    """
+    __slots__ = ("codepoints", "offsets", "names")
+
+    def __init__(self, items: Iterable[Tuple[int, str]] = ()) -> None:
+        """__init__. Constructor.
+
+        Args:
+            items (Iterable[Tuple[int,str]]): Codepoints and names.
+        """
+        self.codepoints: array = array("I")
+        self.offsets: array = array("I", [0])
+        names = []
+        size = 0
+        for codepoint, name in items:
+            size += len(name)
+            self.codepoints.append(codepoint)
+            self.offsets.append(size)
+            names.append(name)
+        self.names: str = "".join(names)
+
+    def __len__(self) -> int:
+        return len(self.codepoints)
+
+    def __getitem__(self, idx: Union[int, slice]):
+        if isinstance(idx, slice):
+            return GlyphTable(self[pos] for pos in range(*idx.indices(len(self))))
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("GlyphTable index out of range")
+        return (self.codepoints[idx],
+                self.names[self.offsets[idx]:self.offsets[idx + 1]])
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        names = self.names
+        for codepoint, start, end in zip(self.codepoints, self.offsets,
+                                         islice(self.offsets, 1, None)):
+            yield codepoint, names[start:end]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            tuple(a) == tuple(b) for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return "GlyphTable(%r)" % list(self)
+
+
+def nameTable(cache: Cache = None) -> NameTable:
+    """nameTable. Retrieves the name table, built once per process. With a
+    cache, the table is built once per Unicode database version and loaded
+    from the cache afterwards.
+
+    Args:
+        cache (Cache, optional): Cache holding the table.
+
+    Returns:
+        Name table.
+    """
+    global _table
+    if _table != None:
+        return _table
+    if cache != None:
+        tables = cache.namespace("unicode")
+        key = cacheKey(unicodedata.unidata_version, array("I").itemsize)
+        data = tables.getBytes(key)
+        if data != None:
+            _table = NameTable.loads(data)
+        else:
+            _table = NameTable.build()
+            tables.setBytes(key, _table.dumps())
+    else:
+        _table = NameTable.build()
+    return _table
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Gensty ranges. Codepoint range and Unicode block filters, based on an
+interval index so filtering is applied before any name resolution."""
+from array import array
+from bisect import bisect_right
+from fontTools.unicodedata import Blocks
+from typing import Iterable, List, Tuple
+
+
+def parseRanges(spec: str) -> List[Tuple[int, int]]:
+    """parseRanges. Parses a comma separated list of codepoints and codepoint
+    ranges, eg. `U+0370-03FF,U+2200-22FF,U+221E`.
+
+    Args:
+        spec (str): Ranges definition.
+
+    Returns:
+        List of inclusive codepoint ranges.
+    """
+    result = []
+    for item in spec.split(","):
+        item = item.strip().upper().replace("U+", "")
+        if item == "":
+            continue
+        try:
+            if "-" in item:
+                start, end = item.split("-", 1)
+                start, end = int(start, 16), int(end, 16)
+            else:
+                start = end = int(item, 16)
+        except ValueError:
+            raise Exception("Error! Invalid codepoint range '%s'." % item)
+        if start > end:
+            raise Exception("Error! Invalid codepoint range '%s'." % item)
+        result.append((start, end))
+    return result
+
+
+def blockRanges(names: Iterable[str]) -> List[Tuple[int, int]]:
+    """blockRanges. Retrieves the codepoint ranges of Unicode blocks, by name
+    (case insensitive).
+
+    Args:
+        names (Iterable[str]): Unicode block names.
+
+    Returns:
+        List of inclusive codepoint ranges.
+    """
+    blocks = {}
+    for idx, block in enumerate(Blocks.VALUES):
+        end = Blocks.RANGES[idx + 1] - 1 if idx + 1 < len(Blocks.RANGES) \
+            else 0x10FFFF
+        blocks[block.lower()] = (Blocks.RANGES[idx], end)
+    result = []
+    for name in names:
+        name = name.strip()
+        if name.lower() not in blocks:
+            raise Exception("Error! Unknown Unicode block '%s'." % name)
+        result.append(blocks[name.lower()])
+    return result
+
+
+def blockName(codepoint: int) -> str:
+    """blockName. Retrieves the Unicode block of a codepoint.
+
+    Args:
+        codepoint (int): Unicode codepoint.
+
+    Returns:
+        Unicode block name.
+    """
+    return Blocks.VALUES[bisect_right(Blocks.RANGES, codepoint) - 1]
+
+
+class RangeIndex:
+    """RangeIndex. Interval index of sorted, non overlapping codepoint ranges.
+
+    Attributes:
+        starts (array): Start of every range.
+        ends (array): End of every range (inclusive).
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]]) -> None:
+        """__init__. Constructor, merges overlapping and adjacent ranges.
+
+        Args:
+            ranges (Iterable[Tuple[int, int]]): Inclusive codepoint ranges.
+        """
+        self.starts: array = array("I")
+        self.ends: array = array("I")
+        for start, end in sorted(ranges):
+            if len(self.ends) > 0 and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+                continue
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __contains__(self, codepoint: int) -> bool:
+        idx = bisect_right(self.starts, codepoint) - 1
+        return idx >= 0 and codepoint <= self.ends[idx]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        """ranges. The merged ranges of index.
+
+        Returns:
+            List of inclusive codepoint ranges.
+        """
+        return list(zip(self.starts, self.ends))
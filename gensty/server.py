@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""Gensty server. A long running process, listening on a Unix socket, which
+runs gensty commands and keeps parsed fonts in memory, so repeated calls pay
+neither Python start up nor font parsing. The client sends its arguments and
+working directory, and prints the output of the command.
+
+The protocol is a single JSON line per connection, in both directions:
+``{"argv": [...], "cwd": "..."}`` and ``{"status": 0, "stdout": "...",
+"stderr": "..."}``."""
+import io
+import os
+import sys
+import copy
+import json
+import signal
+import socket
+import tempfile
+import threading
+import socketserver
+from collections import OrderedDict
+from gensty.config import LRU_SIZE
+from typing import Callable, List, Tuple
+
+
+def socketPath() -> str:
+    """socketPath. The default socket path, `$GENSTY_SOCKET` or `gensty.sock`
+    in the runtime directory (`$XDG_RUNTIME_DIR`, a per user folder of the
+    temporary directory if not set). The socket is kept out of the cache
+    directory, which `--clear-cache` removes.
+
+    Returns:
+        Socket path.
+    """
+    path = os.environ.get("GENSTY_SOCKET")
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime:
+        runtime = os.path.join(tempfile.gettempdir(), "gensty-%s" % (
+            os.getuid() if hasattr(os, "getuid") else "user"))
+    return os.path.join(runtime, "gensty.sock")
+
+
+def styleKey(fontfile: str, options: dict) -> tuple:
+    """styleKey. Identifies the parsed styles of a font file, by the file
+    status of the font and glyphnames and the parsing options.
+
+    Args:
+        fontfile (str): Font file.
+        options (dict): Parsing options, eg. smufl, ranges and blocks.
+
+    Returns:
+        A hashable key, or None if the font file is missing.
+    """
+    signature = []
+    for path in [fontfile, options.get('smufl')]:
+        if path == None:
+            signature.append(None)
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature.append((os.path.realpath(path), stat.st_mtime_ns,
+                          stat.st_size))
+    return tuple(signature) + (json.dumps(options, sort_keys=True,
+                                          default=str),)
+
+
+class FontLRU:
+    """FontLRU. Bounded, thread safe, least recently used cache of parsed
+    fonts. Entries are copied when retrieved, so requests can set package
+    options on them without affecting each other.
+
+    Attributes:
+        maxSize (int): Maximum number of font files kept.
+    """
+
+    def __init__(self, maxSize: int = LRU_SIZE) -> None:
+        """__init__. Constructor.
+
+        Args:
+            maxSize (int): Maximum number of font files kept.
+        """
+        self.maxSize: int = maxSize
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: tuple) -> list:
+        """get. Retrieves copies of the styles of a font file and marks them
+        as recently used.
+
+        Args:
+            key (tuple): Key, see :func:`~gensty.server.styleKey`.
+
+        Returns:
+            The styles, or None.
+        """
+        if key == None:
+            return None
+        with self.__lock:
+            styles = self.__entries.get(key)
+            if styles == None:
+                return None
+            self.__entries.move_to_end(key)
+        return [copy.copy(style) for style in styles]
+
+    def put(self, key: tuple, styles: list):
+        """put. Stores the styles of a font file, evicting the least recently
+        used entries above `maxSize`.
+
+        Args:
+            key (tuple): Key, see :func:`~gensty.server.styleKey`.
+            styles (list): Parsed styles.
+        """
+        if key == None or self.maxSize <= 0:
+            return
+        with self.__lock:
+            self.__entries[key] = [copy.copy(style) for style in styles]
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxSize:
+                self.__entries.popitem(last=False)
+
+
+class ThreadOutput(io.TextIOBase):
+    """ThreadOutput. Replaces `sys.stdout` and `sys.stderr`, so the output of
+    every request thread is captured separately. Other threads write to the
+    original stream."""
+
+    def __init__(self, stream) -> None:
+        """__init__. Constructor.
+
+        Args:
+            stream: Original stream.
+        """
+        self.__stream = stream
+        self.__local = threading.local()
+
+    def capture(self, buffer: io.StringIO):
+        """capture. Redirects the output of current thread.
+
+        Args:
+            buffer (io.StringIO): Buffer, None to stop capturing.
+        """
+        self.__local.buffer = buffer
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.__local, "buffer", None)
+        if buffer != None:
+            return buffer.write(text)
+        return self.__stream.write(text)
+
+    def flush(self):
+        if getattr(self.__local, "buffer", None) == None:
+            self.__stream.flush()
+
+
+def __recvLine(connection: socket.socket) -> bytes:
+    """__recvLine. Reads a line from a socket.
+
+    Args:
+        connection (socket.socket): Connected socket.
+
+    Returns:
+        The line, without line end.
+    """
+    data = bytearray()
+    while not data.endswith(b"\n"):
+        chunk = connection.recv(1 << 16)
+        if not chunk:
+            break
+        data.extend(chunk)
+    return bytes(data).rstrip(b"\n")
+
+
+def __interrupt(signum, frame):
+    """__interrupt. Stops the server on SIGTERM, as on Ctrl+C."""
+    raise KeyboardInterrupt
+
+
+def serve(path: str, handler: Callable[[List[str], str], int]):
+    """serve. Serves requests on a Unix socket, each one in its own thread,
+    until interrupted (Ctrl+C or SIGTERM). The output of handler is captured
+    and sent back.
+
+    Args:
+        path (str): Socket path. An existing socket is replaced, unless a
+        server still listens on it.
+        handler (Callable[[List[str],str],int]): Runs the arguments in the
+        given working directory, returns the exit status.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise Exception("Error! The server needs Unix socket support.")
+    streams = sys.stdout, sys.stderr
+    stdout = ThreadOutput(sys.stdout)
+    stderr = ThreadOutput(sys.stderr)
+    # private names are mangled inside the class body.
+    recvLine = __recvLine
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            line = recvLine(self.request)
+            if len(line) == 0:
+                # a connection probing for a running server.
+                return
+            request = json.loads(line.decode("utf-8"))
+            out, err = io.StringIO(), io.StringIO()
+            stdout.capture(out)
+            stderr.capture(err)
+            try:
+                status = handler(request['argv'], request['cwd'])
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else \
+                    int(e.code != None)
+            except Exception as e:
+                print("%s: %s" % (type(e).__name__, e), file=err)
+                status = 1
+            finally:
+                stdout.capture(None)
+                stderr.capture(None)
+            self.request.sendall(json.dumps({
+                'status': status, 'stdout': out.getvalue(),
+                'stderr': err.getvalue()}).encode("utf-8") + b"\n")
+
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            # left behind by a server which did not stop cleanly.
+            os.remove(path)
+        else:
+            raise Exception("Error! A server is already listening on %s." % path)
+        finally:
+            probe.close()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700,
+                exist_ok=True)
+    sys.stdout, sys.stderr = stdout, stderr
+    server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    server.daemon_threads = True
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, __interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sys.stdout, sys.stderr = streams
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def request(path: str, argv: List[str], cwd: str = None) -> Tuple[int, str, str]:
+    """request. Runs gensty arguments on the server.
+
+    Args:
+        path (str): Socket path.
+        argv (List[str]): Command line arguments.
+        cwd (str, optional): Working directory, the current one by default.
+
+    Returns:
+        Exit status, standard output and standard error of the command.
+    """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+        connection.sendall(json.dumps({
+            'argv': argv, 'cwd': cwd or os.getcwd()}).encode("utf-8") + b"\n")
+        response = json.loads(__recvLine(connection).decode("utf-8"))
+    finally:
+        connection.close()
+    return response['status'], response['stdout'], response['stderr']
+
+
+def client():
+    """client. Thin command line client, a drop-in replacement of `gensty`
+    running on the server. The socket is given by `--connect SOCKET` as first
+    argument, or see :func:`~gensty.server.socketPath`. When no server is
+    listening, the command runs in this process."""
+    argv = sys.argv[1:]
+    path = socketPath()
+    if len(argv) >= 2 and argv[0] == "--connect":
+        path, argv = argv[1], argv[2:]
+    try:
+        status, out, err = request(path, argv)
+    except (OSError, ValueError):
+        from gensty.cli import cli
+        sys.argv = [sys.argv[0]] + argv
+        cli()
+        return
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    sys.exit(status)
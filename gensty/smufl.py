@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Gensty SMuFL. Parses the SMuFL glyphnames.json file once per run and shares
+the glyphname index across fonts and worker processes."""
+import os
+import json
+import marshal
+from gensty.cache import Cache, cacheKey, fileHash
+from typing import Tuple
+
+# Parsed indexes of this process, by glyphnames file and its stat signature.
+_indexes = {}
+
+
+def __parseGlyphnames(path: str) -> Tuple[Tuple[int, str], ...]:
+    """__parseGlyphnames. Parses glyphname file according w3c/smufl
+    reference.
+
+    Args:
+        path (str): SMuFL glyphnames.json file.
+
+    Returns:
+        Codepoints and their description.
+    """
+    result = []
+    with open(path) as json_file:
+        gnames = json.load(json_file)
+        for gname in gnames:
+            codepoint = gnames[gname]["codepoint"].replace("U+", "")
+            result.append((int(codepoint, 16), gname))
+    return tuple(result)
+
+
+def glyphnameIndex(path: str, cache: Cache = None) -> Tuple[Tuple[int, str], ...]:
+    """glyphnameIndex. Retrieves the codepoints and names of glyphnames file.
+    The file is parsed once per process; when a cache is provided, the index
+    is also stored as a compact binary sidecar, loaded by worker processes and
+    later runs instead of parsing the JSON file again.
+
+    Args:
+        path (str): SMuFL glyphnames.json file.
+        cache (Cache, optional): Cache holding the binary sidecar.
+
+    Returns:
+        Codepoints and their description.
+    """
+    stat = os.stat(path)
+    signature = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    index = _indexes.get(signature)
+    if index != None:
+        return index
+
+    if cache != None:
+        sidecars = cache.namespace("glyphnames")
+        key = cacheKey(fileHash(path))
+        data = sidecars.getBytes(key)
+        if data != None:
+            index = marshal.loads(data)
+        else:
+            index = __parseGlyphnames(path)
+            sidecars.setBytes(key, marshal.dumps(index))
+    else:
+        index = __parseGlyphnames(path)
+    _indexes[signature] = index
+    return index
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Gensty subset. Subsets the bundled font to the codepoints emitted in the
+generated package, with fontTools subsetter."""
+import os
+import hashlib
+from fontTools import subset
+from gensty.cache import Cache, cacheKey, fileHash, temporaryCache
+from typing import Iterable
+
+
+def subsetFont(fontfile: str, codepoints: Iterable[int],
+               cache: Cache = None, fontNumber: int = None) -> str:
+    """subsetFont. Creates a subset of the font, including only the given
+    codepoints. The subset keeps the original file name and is cached by font
+    content and codepoints, so it is created only once. The subset of a
+    collection face is a single font, named after the collection and face
+    index, eg. `Noto-2.otf`.
+
+    Args:
+        fontfile (str): Font file.
+        codepoints (Iterable[int]): Codepoints to keep.
+        cache (Cache, optional): Cache holding the subsets, a temporary one is
+        used if not provided.
+        fontNumber (int, optional): Face index, for font collections.
+
+    Returns:
+        Path to subset font file.
+    """
+    if cache == None:
+        cache = temporaryCache()
+    subsets = cache.namespace("subsets")
+    unicodes = sorted(set(codepoints))
+    digest = hashlib.sha256(
+        ",".join(str(code) for code in unicodes).encode("ascii")).hexdigest()
+    key = cacheKey(fileHash(fontfile), digest, fontNumber)
+    filename = os.path.basename(fontfile)
+    if fontNumber != None:
+        filename = "%s-%d" % (os.path.splitext(filename)[0], fontNumber)
+        for extension in [".ttf", ".otf"]:
+            cached = subsets.getFile(key, filename + extension)
+            if cached != None:
+                return cached
+    else:
+        cached = subsets.getFile(key, filename)
+        if cached != None:
+            return cached
+
+    options = subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.notdef_outline = True
+    options.glyph_names = True
+    if fontNumber != None:
+        options.font_number = fontNumber
+    font = subset.load_font(fontfile, options)
+    try:
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=unicodes)
+        subsetter.subset(font)
+        if fontNumber != None:
+            filename += ".ttf" if "glyf" in font else ".otf"
+        os.makedirs(subsets.path, exist_ok=True)
+        tmp = os.path.join(subsets.path, "%s.%d.font.tmp" % (key, os.getpid()))
+        subset.save_font(font, tmp, options)
+    finally:
+        font.close()
+    return subsets.setFile(key, filename, tmp)
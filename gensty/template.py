@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Gensty templates. Templates are compiled once per process into literal
+parts and tokens, so rendering is a single pass, and kept in memory until the
+template file changes."""
+import os
+import re
+from typing import List
+
+TOKEN = re.compile(r"\[(\w+)\]")
+
+# Compiled templates of this process, by path.
+_templates = {}
+
+
+class Template:
+    """Template. A compiled template; literal parts alternate with token names.
+
+    Attributes:
+        parts (List[str]): Literal parts (even) and token names (odd).
+    """
+
+    def __init__(self, text: str) -> None:
+        """__init__. Constructor, compiles the template.
+
+        Args:
+            text (str): Template content, tokens are written as `[token]`.
+        """
+        self.parts: List[str] = TOKEN.split(text)
+
+    def render(self, tokens: dict) -> str:
+        """render. Replaces the tokens of template in a single pass. Unknown
+        tokens are left as is.
+
+        Args:
+            tokens (dict): Tokens dict.
+
+        Returns:
+            String based on template.
+        """
+        parts = self.parts[:]
+        for idx in range(1, len(parts), 2):
+            parts[idx] = tokens.get(parts[idx], "[" + parts[idx] + "]")
+        return "".join(parts)
+
+
+def templatePath(template: str, directory: str = None) -> str:
+    """templatePath. Resolves a template file. A template with the same file
+    name in a user directory overrides the bundled one.
+
+    Args:
+        template (str): Template file, relative to gensty package.
+        directory (str, optional): User templates directory.
+
+    Returns:
+        Template file path.
+    """
+    if directory != None:
+        custom = os.path.join(directory, os.path.basename(template))
+        if os.path.isfile(custom):
+            return custom
+    genstyPath = os.path.abspath(os.path.dirname(__file__))
+    return os.path.join(genstyPath, template)
+
+
+def loadTemplate(template: str, directory: str = None) -> Template:
+    """loadTemplate. Retrieves a compiled template, compiling it only the
+    first time or when the template file changed.
+
+    Args:
+        template (str): Template file, relative to gensty package.
+        directory (str, optional): User templates directory.
+
+    Returns:
+        The compiled template.
+    """
+    path = templatePath(template, directory)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _templates.get(path)
+    if cached != None and cached[0] == signature:
+        return cached[1]
+    with open(path) as templateFile:
+        compiled = Template(templateFile.read())
+    _templates[path] = (signature, compiled)
+    return compiled
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""Gensty timings. Records wall time, CPU time and peak allocation of the
+generation phases, per font. Phases are reported to hooks, so the cost of
+instrumentation is a list check while no hook is registered."""
+import json
+import time
+import functools
+import inspect
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+_hooks: List[Callable[[dict], None]] = []
+# open phases per thread, holding allocation at start and peak of closed
+# children.
+_local = threading.local()
+
+
+def addHook(hook: Callable[[dict], None]):
+    """addHook. Registers a callable, called with a record for every phase
+    completed. A record is a dict with keys `phase`, `font`, `wall`, `cpu`
+    (seconds) and `peak` (bytes allocated above phase start, None unless
+    tracemalloc is tracing).
+
+    Args:
+        hook (Callable[[dict], None]): The callable.
+    """
+    _hooks.append(hook)
+
+
+def removeHook(hook: Callable[[dict], None]):
+    """removeHook. Unregisters a hook, see :func:`~gensty.timings.addHook`.
+
+    Args:
+        hook (Callable[[dict], None]): The callable.
+    """
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def enabled() -> bool:
+    """enabled. Whether any hook is registered.
+
+    Returns:
+        True if phases are recorded.
+    """
+    return len(_hooks) > 0
+
+
+def emit(record: dict):
+    """emit. Reports a record to every hook, eg. records collected in a
+    worker process.
+
+    Args:
+        record (dict): Phase record.
+    """
+    for hook in list(_hooks):
+        hook(record)
+
+
+def __stack() -> list:
+    """__stack. Open phases of the current thread.
+
+    Returns:
+        The list of phase states.
+    """
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def __begin() -> list:
+    """__begin. Opens a phase.
+
+    Returns:
+        Phase state: wall and CPU time at start, allocation at start and
+        peak of closed children.
+    """
+    current = None
+    _stack = __stack()
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        if len(_stack) > 0:
+            _stack[-1][3] = max(_stack[-1][3], peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+    state = [time.perf_counter(), time.process_time(), current, 0]
+    _stack.append(state)
+    return state
+
+
+def __end(state: list) -> tuple:
+    """__end. Closes a phase.
+
+    Args:
+        state (list): Phase state, returned by `__begin`.
+
+    Returns:
+        Wall time, CPU time and peak allocation of phase.
+    """
+    wall = time.perf_counter() - state[0]
+    cpu = time.process_time() - state[1]
+    peak = None
+    _stack = __stack()
+    _stack.remove(state)
+    if state[2] != None and tracemalloc.is_tracing():
+        top = max(tracemalloc.get_traced_memory()[1], state[3])
+        peak = max(top - state[2], 0)
+        if len(_stack) > 0:
+            _stack[-1][3] = max(_stack[-1][3], top)
+    return wall, cpu, peak
+
+
+@contextmanager
+def phase(name: str, font: str = None):
+    """phase. Records the enclosed block as a phase.
+
+    Args:
+        name (str): Phase name.
+        font (str, optional): Font file or package name.
+    """
+    if not enabled():
+        yield
+        return
+    state = __begin()
+    try:
+        yield
+    finally:
+        wall, cpu, peak = __end(state)
+        emit({'phase': name, 'font': font, 'wall': wall, 'cpu': cpu,
+              'peak': peak})
+
+
+def __iterPhase(name: str, font, iterator: Iterator) -> Iterator:
+    """__iterPhase. Records a generator as a single phase, accounting only
+    the time spent producing items, not consuming them.
+
+    Args:
+        name (str): Phase name.
+        font: Callable returning the font label.
+        iterator (Iterator): The generator.
+
+    Yields:
+        The generator items.
+    """
+    wall, cpu, peak = 0.0, 0.0, None
+    try:
+        while True:
+            state = __begin()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                spent = __end(state)
+                wall += spent[0]
+                cpu += spent[1]
+                if spent[2] != None:
+                    peak = max(peak or 0, spent[2])
+            yield item
+    finally:
+        emit({'phase': name, 'font': font(), 'wall': wall, 'cpu': cpu,
+              'peak': peak})
+
+
+def profiled(name: str, font: Callable = None):
+    """profiled. Decorator recording every call as a phase. Generator
+    functions are recorded over their whole iteration.
+
+    Args:
+        name (str): Phase name.
+        font (Callable, optional): Called with the function arguments,
+        returns the font label. Defaults to the `fontfile` attribute of the
+        first argument, read when the phase ends.
+    """
+    def decorator(func):
+        def label(args, kwargs):
+            if font != None:
+                return font(*args, **kwargs)
+            if len(args) > 0:
+                return getattr(args[0], "fontfile", None)
+            return None
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not enabled():
+                    return func(*args, **kwargs)
+                return __iterPhase(name, lambda: label(args, kwargs),
+                                   func(*args, **kwargs))
+            return wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            state = __begin()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                wall, cpu, peak = __end(state)
+                emit({'phase': name, 'font': label(args, kwargs),
+                      'wall': wall, 'cpu': cpu, 'peak': peak})
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def capture(memory: bool = False):
+    """capture. Collects the records of the enclosed block in a list, instead
+    of reporting them to the registered hooks. Used in worker processes,
+    whose records are passed back and reported with
+    :func:`~gensty.timings.emit`.
+
+    Args:
+        memory (bool): Traces allocations during the block.
+
+    Yields:
+        The list of records.
+    """
+    global _hooks
+    records = []
+    hooks = _hooks
+    _hooks = [records.append]
+    started = memory == True and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield records
+    finally:
+        if started:
+            tracemalloc.stop()
+        _hooks = hooks
+
+
+class Profiler:
+    """Profiler. Collects the records of all phases and reports them.
+
+    Attributes:
+        records (List[dict]): Phase records, see
+        :func:`~gensty.timings.addHook`.
+        wall (float): Total wall time of profiled run.
+    """
+
+    def __init__(self, memory: bool = True):
+        """__init__. Constructor.
+
+        Args:
+            memory (bool): Traces allocations with tracemalloc, which slows
+            down the profiled run. Peaks of phases running concurrently in
+            threads overlap.
+        """
+        self.records: List[dict] = []
+        self.wall: float = 0.0
+        self.__memory: bool = memory
+        self.__tracing: bool = False
+        self.__start: float = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """start. Starts recording."""
+        if self.__memory == True and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__tracing = True
+        self.__start = time.perf_counter()
+        addHook(self.records.append)
+
+    def stop(self):
+        """stop. Stops recording."""
+        removeHook(self.records.append)
+        if self.__start != None:
+            self.wall += time.perf_counter() - self.__start
+            self.__start = None
+        if self.__tracing == True:
+            tracemalloc.stop()
+            self.__tracing = False
+
+    def phases(self) -> dict:
+        """phases. Sums the records per phase. Phases nest, eg. `Codepoints`
+        is part of `Info`, so their totals overlap.
+
+        Returns:
+            Calls, wall time, CPU time and highest peak per phase.
+        """
+        phases = {}
+        for record in self.records:
+            total = phases.setdefault(record['phase'], {
+                'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak': None})
+            total['calls'] += 1
+            total['wall'] += record['wall']
+            total['cpu'] += record['cpu']
+            if record['peak'] != None:
+                total['peak'] = max(total['peak'] or 0, record['peak'])
+        return phases
+
+    def report(self) -> dict:
+        """report. Creates the full report.
+
+        Returns:
+            A JSON serializable dict, with the total wall time, the totals per
+            phase and all records.
+        """
+        return {
+            'wall': self.wall,
+            'phases': self.phases(),
+            'records': self.records,
+        }
+
+    def save(self, filename: str):
+        """save. Saves the report as JSON.
+
+        Args:
+            filename (str): JSON file path.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.report(), f, indent=1)
+
+    def summary(self, top: int = 10) -> str:
+        """summary. Human readable report, the totals per phase and the
+        `top` slowest phases of single fonts.
+
+        Args:
+            top (int): Number of slowest phases listed.
+
+        Returns:
+            The summary.
+        """
+        def memory(peak):
+            return "-" if peak == None else "%.1f MiB" % (peak / 2**20)
+
+        lines = ["Total %.3fs" % self.wall,
+                 "%-16s %6s %10s %10s %10s" % ("Phase", "Calls", "Wall",
+                                               "CPU", "Peak")]
+        for name, total in sorted(self.phases().items(),
+                                  key=lambda item: -item[1]['wall']):
+            lines.append("%-16s %6d %9.3fs %9.3fs %10s" % (
+                name, total['calls'], total['wall'], total['cpu'],
+                memory(total['peak'])))
+        slowest = sorted(self.records, key=lambda record: -record['wall'])
+        if len(slowest) > 0 and top > 0:
+            lines.append("Slowest %d:" % min(top, len(slowest)))
+            for record in slowest[:top]:
+                lines.append("  %9.3fs %10s  %s %s" % (
+                    record['wall'], memory(record['peak']), record['phase'],
+                    record['font'] or ""))
+        return "\n".join(lines)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Gensty watch. Detects added, changed and removed fonts, by polling file
+status or, when the inotify_simple package is available, woken up by inotify
+events. Bursts of changes are coalesced into a single change set."""
+import os
+import time
+from gensty.helpers import checkFont, discoverFonts
+from gensty.config import SUPPORTED_FONTS
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+class Watcher:
+    """Watcher. Watches a font file or the fonts of a directory.
+
+    Attributes:
+        path (str): Watched font file or directory.
+        files (Dict[str,tuple]): Modification time and size of every font,
+        as of the last poll, in discovery order.
+    """
+
+    def __init__(self, path: str, interval: float = 1.0,
+                 debounce: float = 0.5, **discovery) -> None:
+        """__init__. Constructor, takes the initial snapshot.
+
+        Args:
+            path (str): Font file or directory.
+            interval (float): Seconds between polls.
+            debounce (float): Seconds without changes before a change set is
+            reported.
+            discovery: Keyword arguments of
+            :func:`~gensty.helpers.discoverFonts`.
+        """
+        self.path: str = path
+        self.__interval: float = interval
+        self.__debounce: float = debounce
+        self.__discovery: dict = discovery
+        self.__inotify = None
+        self.__watched: Dict[str, int] = {}
+        if inotify_simple != None:
+            try:
+                self.__inotify = inotify_simple.INotify()
+            except OSError:
+                self.__inotify = None
+        self.files: Dict[str, tuple] = self.__snapshot()
+
+    def close(self):
+        """close. Releases the inotify instance, if any."""
+        if self.__inotify != None:
+            self.__inotify.close()
+            self.__inotify = None
+
+    def __watchFolder(self, folder: str):
+        """__watchFolder. Adds an inotify watch to a folder, once.
+
+        Args:
+            folder (str): Folder path.
+        """
+        if self.__inotify == None or folder in self.__watched:
+            return
+        flags = inotify_simple.flags
+        try:
+            self.__watched[folder] = self.__inotify.add_watch(
+                folder, flags.CREATE | flags.CLOSE_WRITE | flags.MODIFY |
+                flags.DELETE | flags.MOVED_FROM | flags.MOVED_TO |
+                flags.ATTRIB)
+        except OSError:
+            pass
+
+    def __snapshot(self) -> Dict[str, tuple]:
+        """__snapshot. Modification time and size of every font.
+
+        Returns:
+            Font paths and their (mtime, size).
+        """
+        if os.path.isdir(self.path):
+            fontfiles = discoverFonts(self.path, SUPPORTED_FONTS,
+                                      **self.__discovery)
+            self.__watchFolder(self.path)
+        elif checkFont(self.path, SUPPORTED_FONTS):
+            fontfiles = [self.path]
+            self.__watchFolder(os.path.dirname(os.path.abspath(self.path)))
+        else:
+            fontfiles = []
+        files = {}
+        for fontfile in fontfiles:
+            try:
+                stat = os.stat(fontfile)
+            except OSError:
+                continue
+            files[fontfile] = (stat.st_mtime_ns, stat.st_size)
+            # new subfolders are watched as soon as they contain fonts.
+            self.__watchFolder(os.path.dirname(fontfile))
+        return files
+
+    def __wait(self, timeout: float):
+        """__wait. Waits `timeout` seconds, or less if an inotify event
+        arrives earlier.
+
+        Args:
+            timeout (float): Seconds.
+        """
+        if self.__inotify == None:
+            time.sleep(timeout)
+            return
+        self.__inotify.read(timeout=int(timeout * 1000))
+
+    def __settle(self, timeout: float):
+        """__settle. Waits until no inotify event arrived for `timeout`
+        seconds, discarding the events meanwhile, so a burst of writes (eg. a
+        font being copied) is waited out. Without inotify, waits `timeout`
+        seconds.
+
+        Args:
+            timeout (float): Seconds.
+        """
+        if self.__inotify == None:
+            time.sleep(timeout)
+            return
+        while len(self.__inotify.read(timeout=int(timeout * 1000))) > 0:
+            pass
+
+    def poll(self) -> Tuple[List[str], List[str], List[str]]:
+        """poll. Compares the fonts with the last snapshot, and keeps the new
+        one.
+
+        Returns:
+            Added, changed and removed font files.
+        """
+        before = self.files
+        self.files = self.__snapshot()
+        return diffSnapshots(before, self.files)
+
+    def changes(self) -> Iterator[Tuple[List[str], List[str], List[str]]]:
+        """changes. Waits for changes, forever. Once fonts change, polls
+        again until no change happened for `debounce` seconds, so a burst of
+        changes (eg. copying a folder of fonts) is reported once.
+
+        Yields:
+            Added, changed and removed font files.
+        """
+        while True:
+            before = self.files
+            if self.poll() == ([], [], []):
+                self.__wait(self.__interval)
+                continue
+            while True:
+                self.__settle(self.__debounce)
+                if self.poll() == ([], [], []):
+                    break
+            changes = diffSnapshots(before, self.files)
+            if changes != ([], [], []):
+                yield changes
+
+
+def diffSnapshots(before: Dict[str, tuple],
+                  after: Dict[str, tuple]) -> Tuple[List[str], List[str], List[str]]:
+    """diffSnapshots. Compares two snapshots of fonts.
+
+    Args:
+        before (Dict[str,tuple]): Earlier snapshot.
+        after (Dict[str,tuple]): Later snapshot.
+
+    Returns:
+        Added, changed and removed font files, each in path order.
+    """
+    added = sorted(path for path in after if path not in before)
+    removed = sorted(path for path in before if path not in after)
+    changed = sorted(path for path in after
+                     if path in before and before[path] != after[path])
+    return added, changed, removed
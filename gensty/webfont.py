@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Gensty web fonts. WOFF and WOFF2 fonts are decompressed once to plain
+OpenType (sfnt) files, kept in the content addressed cache, which are parsed
+and bundled instead of the web font."""
+import os
+from fontTools import ttLib
+from gensty.cache import Cache, cacheKey, fileHash, temporaryCache
+
+
+def sfntFont(fontfile: str, cache: Cache = None) -> str:
+    """sfntFont. Decompresses a WOFF/WOFF2 font to an OpenType font, named
+    after the web font, eg. `Symbols.woff2` to `Symbols.otf`. The result is
+    cached by web font content, so decompression happens only once, and is
+    kept while the cache defers eviction, see
+    :func:`~gensty.cache.Cache.deferEviction`. WOFF2 needs the brotli package.
+
+    Args:
+        fontfile (str): Web font file.
+        cache (Cache, optional): Cache holding the decompressed fonts, a
+        temporary one is used if not provided.
+
+    Returns:
+        Path to OpenType font file.
+    """
+    if cache == None:
+        cache = temporaryCache()
+    sfnts = cache.namespace("sfnt")
+    key = cacheKey(fileHash(fontfile))
+    stem = os.path.splitext(os.path.basename(fontfile))[0]
+    for extension in [".ttf", ".otf"]:
+        cached = sfnts.getFile(key, stem + extension)
+        if cached != None:
+            return cached
+
+    try:
+        font = ttLib.TTFont(fontfile, recalcBBoxes=False,
+                            recalcTimestamp=False)
+    except ImportError:
+        raise Exception("Error! WOFF2 fonts need the brotli package "
+                        "(pip install gensty[woff2]).")
+    try:
+        if font.flavor == None:
+            raise Exception("Error! %s is not a web font." % fontfile)
+        font.flavor = None
+        filename = stem + (".ttf" if "glyf" in font else ".otf")
+        os.makedirs(sfnts.path, exist_ok=True)
+        tmp = os.path.join(sfnts.path, "%s.%d.font.tmp" % (key, os.getpid()))
+        font.save(tmp)
+    finally:
+        font.close()
+    return sfnts.setFile(key, filename, tmp)
@@ -26,9 +26,11 @@ setup(
     package_dir={'gensty': 'gensty'},
     include_package_data=True,
     entry_points = {
-        'console_scripts': ['gensty=gensty.cli:cli'],
+        'console_scripts': ['gensty=gensty.cli:cli',
+                            'gensty-client=gensty.server:client'],
     },
     install_requires=['fontTools'],
+    extras_require={'woff2': ['brotli']},
     license='GPL-2.0 License',
     zip_safe=False,
     keywords='latex generator package fonts',